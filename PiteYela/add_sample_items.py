@@ -4,10 +4,10 @@ Run this script to populate the database with test products.
 """
 import sys
 import os
+import json
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app.database import get_connection
-from app.config import BASE_DIR, DATA_DIR
 
 # Sample products with Uganda-relevant barcodes
 SAMPLE_PRODUCTS = [
@@ -133,67 +133,68 @@ SAMPLE_PRODUCTS = [
     }
 ]
 
+# Insert parameters precomputed once (profit folded in), matching the
+# column order of the INSERT in add_sample_items()
+_INSERT_ROWS = tuple(
+    (p["id"], p["name"], p["description"], p["cost_price"], p["selling_price"],
+     p["selling_price"] - p["cost_price"], p["quantity_stocked"], p["quantity_stocked"])
+    for p in SAMPLE_PRODUCTS
+)
+
 def add_sample_items():
     """Add sample items to the database."""
     print("Adding sample items to database...")
     print("=" * 50)
     
-    # Ensure database exists
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    
     conn = get_connection()
     try:
         cursor = conn.cursor()
+        cursor.row_factory = None  # Only positional access needed here
         
-        added_count = 0
-        skipped_count = 0
-        
-        for product in SAMPLE_PRODUCTS:
-            # Check if product already exists
-            cursor.execute("SELECT id FROM products WHERE id = ?", (product["id"],))
-            if cursor.fetchone():
-                print(f"[SKIP] Product {product['id']} ({product['name']}) already exists")
-                skipped_count += 1
-                continue
-            
-            # Calculate profit
-            profit = product["selling_price"] - product["cost_price"]
-            
-            # Insert product
-            cursor.execute("""
-                INSERT INTO products 
-                (id, name, description, cost_price, selling_price, profit, 
-                 quantity_stocked, quantity_available)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                product["id"],
-                product["name"],
-                product["description"],
-                product["cost_price"],
-                product["selling_price"],
-                profit,
-                product["quantity_stocked"],
-                product["quantity_stocked"]
-            ))
-            
-            print(f"[ADDED] {product['id']} - {product['name']} - UGX {product['selling_price']:,}")
-            added_count += 1
+        # Find the sample products that already exist, passing every id as
+        # one JSON array parameter
+        existing = {row[0] for row in cursor.execute(
+            "SELECT p.id FROM products p JOIN json_each(?) j ON p.id = j.value",
+            (json.dumps([row[0] for row in _INSERT_ROWS]),)
+        )}
         
+        # Insert all sample products in a single transaction; rows whose id
+        # already exists are skipped by the engine
+        conn.execute("BEGIN")
+        cursor.executemany("""
+            INSERT OR IGNORE INTO products 
+            (id, name, description, cost_price, selling_price, profit, 
+             quantity_stocked, quantity_available)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, _INSERT_ROWS)
+        added_count = cursor.rowcount
+        skipped_count = len(_INSERT_ROWS) - added_count
         conn.commit()
         
-        print("=" * 50)
-        print(f"Summary:")
-        print(f"  Added: {added_count} products")
-        print(f"  Skipped: {skipped_count} products (already exist)")
-        print(f"  Total: {len(SAMPLE_PRODUCTS)} products")
-        print("=" * 50)
-        print("\nSample items added successfully!")
-        print("\nYou can now test the POS system with these products.")
-        print("Use the barcode numbers to scan/enter products.")
+        # Build the report and write it to stdout in one call
+        lines: list[str] = [
+            f"[SKIP] Product {product_id} ({name}) already exists"
+            if product_id in existing
+            else f"[ADDED] {product_id} - {name} - UGX {selling_price:,}"
+            for product_id, name, _, _, selling_price, *_ in _INSERT_ROWS
+        ]
+        lines += [
+            "=" * 50,
+            "Summary:",
+            f"  Added: {added_count} products",
+            f"  Skipped: {skipped_count} products (already exist)",
+            f"  Total: {len(SAMPLE_PRODUCTS)} products",
+            "=" * 50,
+            "\nSample items added successfully!",
+            "\nYou can now test the POS system with these products.",
+            "Use the barcode numbers to scan/enter products.",
+        ]
+        sys.stdout.write("\n".join(lines) + "\n")
         
         return True
         
     except Exception as e:
+        conn.rollback()
         print(f"[ERROR] Failed to add sample items: {e}")
         import traceback
         traceback.print_exc()
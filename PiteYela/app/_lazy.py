@@ -0,0 +1,37 @@
+"""
+Lazily imported admin windows for Alcohol POS System.
+Each window module is imported on first access and then kept as a plain
+attribute of this module, so later lookups skip the import machinery.
+"""
+import importlib
+from typing import TYPE_CHECKING
+
+# Static imports for type checkers and PyInstaller's dependency scan
+if TYPE_CHECKING:
+    from app.inventory import InventoryWindow
+    from app.reports import ReportsWindow
+    from app.users import UsersWindow
+    from app.settings import SettingsWindow
+    from app.backup import BackupWindow
+    from app.password import PasswordChangeDialog
+
+# Attribute name -> module that defines it
+_SOURCES = {
+    'InventoryWindow': 'app.inventory',
+    'ReportsWindow': 'app.reports',
+    'UsersWindow': 'app.users',
+    'SettingsWindow': 'app.settings',
+    'BackupWindow': 'app.backup',
+    'PasswordChangeDialog': 'app.password',
+}
+
+__all__ = list(_SOURCES)
+
+def __getattr__(name: str):
+    """Import the module behind name on first use and cache the attribute."""
+    module_name = _SOURCES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
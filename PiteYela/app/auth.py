@@ -2,21 +2,57 @@
 Authentication and authorization for Alcohol POS System.
 Handles login, password hashing, and role checking.
 """
-import bcrypt
+import base64
+import secrets
 import sqlite3
+from functools import wraps
 from typing import Optional, Dict
 from app.database import get_connection
+from app.config import BCRYPT_ROUNDS
 
 # Global session storage
 _current_user: Optional[Dict] = None
+_current_role: str = ""
+
+# Role checks are answered from flags refreshed only on login/logout
+_is_admin = False
+_is_cashier = False
+
+# bcrypt salt header for the configured cost, built once
+_BCRYPT_PREFIX = b"$2b$" + f"{BCRYPT_ROUNDS:02d}".encode() + b"$"
+
+# bcrypt encodes salts with its own base64 alphabet
+_BCRYPT_B64 = bytes.maketrans(
+    b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/",
+    b"./ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+)
+
+def _fast_salt() -> bytes:
+    """Build a bcrypt salt from 16 random bytes using the cached cost prefix."""
+    return _BCRYPT_PREFIX + base64.b64encode(secrets.token_bytes(16))[:22].translate(_BCRYPT_B64)
+
+# Kept as one constant so every login hits the same statement cache entry
+_LOGIN_SQL = """
+    SELECT id, username, password_hash, role, full_name, is_active
+    FROM users
+    WHERE username = ? AND is_active = 1
+"""
+
+# Password change statements, reused from the statement cache
+_PASSWORD_HASH_SQL = "SELECT password_hash FROM users WHERE id = ?"
+_UPDATE_PASSWORD_SQL = "UPDATE users SET password_hash = ? WHERE id = ?"
 
 def hash_password(password: str) -> str:
-    """Hash password using bcrypt."""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    """Hash password using bcrypt with the configured cost factor."""
+    import bcrypt  # Deferred so importing this module doesn't load the native library
+    return bcrypt.hashpw(password.encode('utf-8'), _fast_salt()).decode('utf-8')
 
 def verify_password(password: str, password_hash: str) -> bool:
     """Verify password against hash."""
+    import bcrypt
     try:
+        # checkpw re-hashes and compares the digests in constant time, so
+        # no hand-rolled hmac.compare_digest is needed here
         return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
     except Exception:
         return False
@@ -28,16 +64,12 @@ def login(username: str, password: str) -> tuple[bool, Optional[Dict], str]:
     Returns:
         (success, user_dict, error_message)
     """
-    global _current_user
+    global _current_user, _current_role, _is_admin, _is_cashier
     
     conn = get_connection()
     try:
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT id, username, password_hash, role, full_name, is_active
-            FROM users
-            WHERE username = ? AND is_active = 1
-        """, (username,))
+        cursor.execute(_LOGIN_SQL, (username,))
         
         row = cursor.fetchone()
         if not row:
@@ -54,17 +86,21 @@ def login(username: str, password: str) -> tuple[bool, Optional[Dict], str]:
         }
         
         _current_user = user
+        _current_role = user['role']
+        _is_admin = _current_role == 'admin'
+        _is_cashier = _current_role == 'cashier'
         return True, user, ""
         
     except Exception as e:
         return False, None, f"Login error: {str(e)}"
-    finally:
-        conn.close()
 
 def logout():
     """Logout current user."""
-    global _current_user
+    global _current_user, _current_role, _is_admin, _is_cashier
     _current_user = None
+    _current_role = ""
+    _is_admin = False
+    _is_cashier = False
 
 def get_current_user() -> Optional[Dict]:
     """Get current logged-in user."""
@@ -72,24 +108,30 @@ def get_current_user() -> Optional[Dict]:
 
 def is_admin() -> bool:
     """Check if current user is admin."""
-    return _current_user is not None and _current_user.get('role') == 'admin'
+    return _is_admin
 
 def is_cashier() -> bool:
     """Check if current user is cashier."""
-    return _current_user is not None and _current_user.get('role') == 'cashier'
+    return _is_cashier
 
 def require_admin(func):
     """Decorator to require admin role."""
+    @wraps(func)
     def wrapper(*args, **kwargs):
-        if not is_admin():
+        if not _is_admin:
             raise PermissionError("Admin access required")
         return func(*args, **kwargs)
     return wrapper
 
-def create_user(username: str, password: str, role: str, full_name: str) -> tuple[bool, str]:
+def create_user(username: str, password: str, role: str, full_name: str,
+                password_hash: Optional[str] = None) -> tuple[bool, str]:
     """
     Create a new user (admin only).
     
+    Args:
+        password_hash: hash_password(password), when the caller has
+            already computed it (e.g. on a worker thread)
+    
     Returns:
         (success, error_message)
     """
@@ -99,7 +141,8 @@ def create_user(username: str, password: str, role: str, full_name: str) -> tupl
     conn = get_connection()
     try:
         cursor = conn.cursor()
-        password_hash = hash_password(password)
+        if password_hash is None:
+            password_hash = hash_password(password)
         
         cursor.execute("""
             INSERT INTO users (username, password_hash, role, full_name)
@@ -109,24 +152,39 @@ def create_user(username: str, password: str, role: str, full_name: str) -> tupl
         conn.commit()
         return True, ""
     except sqlite3.IntegrityError:
+        conn.rollback()
         return False, "Username already exists"
     except Exception as e:
+        conn.rollback()
         return False, f"Error creating user: {str(e)}"
-    finally:
-        conn.close()
 
-def get_all_users() -> list[Dict]:
-    """Get all users (admin only)."""
+def change_password(user_id: int, current_password: str, new_password: str) -> tuple[bool, str]:
+    """
+    Replace a user's password after checking their current one.
+    
+    Returns:
+        (success, error_message)
+    """
     conn = get_connection()
     try:
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT id, username, role, full_name, created_at, is_active
-            FROM users
-            ORDER BY created_at DESC
-        """)
-        
-        return [dict(row) for row in cursor.fetchall()]
-    finally:
-        conn.close()
+        # Commits the update once on success, rolls back if anything raises
+        with conn:
+            row = conn.execute(_PASSWORD_HASH_SQL, (user_id,)).fetchone()
+            if not row or not verify_password(current_password, row['password_hash']):
+                return False, "Current password is incorrect"
+            conn.execute(_UPDATE_PASSWORD_SQL, (hash_password(new_password), user_id))
+        return True, ""
+    except Exception as e:
+        return False, f"Failed to change password: {str(e)}"
+
+def get_all_users() -> list[Dict]:
+    """Get all users (admin only)."""
+    cursor = get_connection().cursor()
+    cursor.execute("""
+        SELECT id, username, role, full_name, created_at, is_active
+        FROM users
+        ORDER BY created_at DESC
+    """)
+    
+    return [dict(row) for row in cursor.fetchall()]
 
@@ -2,18 +2,24 @@
 Backup and restore module for Alcohol POS System.
 Handles database backup and restore functionality.
 """
+import os
 import shutil
+import sqlite3
 from pathlib import Path
 from datetime import datetime
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QPushButton, QLabel,
                              QFileDialog, QMessageBox, QGroupBox, QHBoxLayout)
 from PyQt6.QtCore import Qt
 from app.config import DB_PATH, BASE_DIR
+from app.database import get_connection, close_all_connections
+from app.models import invalidate_product_cache
 from app.auth import is_admin
 from app.utils import show_error_dialog, show_info_dialog
 
 BACKUP_DIR = BASE_DIR / "backups"
-BACKUP_DIR.mkdir(parents=True, exist_ok=True)
+
+# Copy restores in 4 MiB chunks instead of shutil's default buffer size
+shutil.COPY_BUFSIZE = 4 * 1024 * 1024
 
 def create_backup() -> tuple[bool, str]:
     """Create a backup of the database."""
@@ -23,9 +29,15 @@ def create_backup() -> tuple[bool, str]:
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         backup_filename = f"pos_backup_{timestamp}.db"
+        BACKUP_DIR.mkdir(parents=True, exist_ok=True)
         backup_path = BACKUP_DIR / backup_filename
         
-        shutil.copy2(DB_PATH, backup_path)
+        # Use SQLite's online backup API so pages still in the WAL are included
+        backup_conn = sqlite3.connect(str(backup_path))
+        try:
+            get_connection().backup(backup_conn, pages=1024)
+        finally:
+            backup_conn.close()
         return True, str(backup_path)
     except Exception as e:
         return False, str(e)
@@ -37,14 +49,30 @@ def restore_backup(backup_path: str) -> tuple[bool, str]:
         if not backup_file.exists():
             return False, "Backup file not found"
         
+        # Flush the WAL into the main file and release every open handle
+        # before the database file is swapped out
+        if DB_PATH.exists():
+            get_connection().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        close_all_connections()
+        
         # Create a backup of current database before restoring
         if DB_PATH.exists():
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            BACKUP_DIR.mkdir(parents=True, exist_ok=True)
             safety_backup = BACKUP_DIR / f"pre_restore_{timestamp}.db"
             shutil.copy2(DB_PATH, safety_backup)
         
-        # Restore
-        shutil.copy2(backup_file, DB_PATH)
+        # Restore via a sibling temp file so DB_PATH is never half-written
+        tmp_path = DB_PATH.with_suffix(".db.tmp")
+        shutil.copy2(backup_file, tmp_path)
+        os.replace(tmp_path, DB_PATH)
+        
+        # Stale sidecar files must not be replayed over the restored pages
+        for suffix in ("-wal", "-shm"):
+            sidecar = DB_PATH.with_name(DB_PATH.name + suffix)
+            if sidecar.exists():
+                sidecar.unlink()
+        invalidate_product_cache()
         return True, "Database restored successfully"
     except Exception as e:
         return False, str(e)
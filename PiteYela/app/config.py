@@ -15,9 +15,11 @@ BASE_DIR = DOCUMENTS_FOLDER / "PiteYela_PoS"
 DATA_DIR = BASE_DIR / "data"
 DB_PATH = DATA_DIR / "pos.db"
 
-# Ensure directories exist
-BASE_DIR.mkdir(parents=True, exist_ok=True)
-DATA_DIR.mkdir(parents=True, exist_ok=True)
+def ensure_dirs() -> None:
+    """Create the application data directories if they are missing."""
+    for directory in (BASE_DIR, DATA_DIR):
+        if not directory.is_dir():
+            directory.mkdir(parents=True, exist_ok=True)
 
 # Shop configuration
 SHOP_NAME = "PiteYelaHouseofWine_POS"
@@ -28,6 +30,18 @@ SHOP_CONTACT = "0392158188"
 # Database settings
 DB_TIMEOUT = 20.0
 
+# Security settings
+def _bcrypt_rounds(default: int = 10) -> int:
+    """Read POS_BCRYPT_ROUNDS, clamped to the 4-31 costs bcrypt accepts."""
+    try:
+        rounds = int(os.getenv("POS_BCRYPT_ROUNDS", str(default)))
+    except ValueError:
+        return default
+    return min(max(rounds, 4), 31)
+
+# bcrypt cost factor for new password hashes (existing hashes keep their own cost)
+BCRYPT_ROUNDS = _bcrypt_rounds()
+
 # Receipt settings
 RECEIPT_ALCOHOL_WARNING = "18+ Alcohol Warning: This product contains alcohol. Must be 18+ to purchase."
 
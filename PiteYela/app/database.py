@@ -4,16 +4,81 @@ Handles SQLite database initialization, table creation, and transaction manageme
 """
 import sqlite3
 import os
+import atexit
+import threading
+from itertools import groupby
 from pathlib import Path
 from typing import Optional, List, Tuple, Any
-from app.config import DB_PATH, DATA_DIR
+from app.config import DB_PATH, DATA_DIR, DB_TIMEOUT, ensure_dirs
+
+# One long-lived connection per thread, keyed by thread ident
+_connections: dict[int, sqlite3.Connection] = {}
+_connections_lock = threading.Lock()
+
+# Data directories are created on the first connection, not at import
+_dirs_ready = False
+
+# WAL mode is persistent in the database file, so it only needs setting once
+_wal_enabled = False
+
+def _apply_pragmas(conn: sqlite3.Connection) -> None:
+    """Apply per-connection performance pragmas."""
+    global _wal_enabled
+    if not _wal_enabled:
+        conn.execute("PRAGMA journal_mode=WAL")
+        _wal_enabled = True
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-64000")
+    conn.execute("PRAGMA mmap_size=268435456")
+
+class CachedConnection(sqlite3.Connection):
+    """
+    Connection kept open for the lifetime of its thread.
+    
+    close() is a no-op so callers can keep releasing connections as before;
+    use close_all_connections() to actually close them.
+    """
+    
+    def close(self) -> None:
+        pass
 
 def get_connection() -> sqlite3.Connection:
-    """Get a database connection with proper settings."""
-    conn = sqlite3.connect(str(DB_PATH), timeout=20.0)
-    conn.row_factory = sqlite3.Row  # Enable column access by name
+    """Get the current thread's database connection, opening it on first use."""
+    global _dirs_ready
+    thread_id = threading.get_ident()
+    conn = _connections.get(thread_id)
+    if conn is None:
+        if not _dirs_ready:
+            ensure_dirs()
+            _dirs_ready = True
+        conn = sqlite3.connect(str(DB_PATH), timeout=DB_TIMEOUT, check_same_thread=False,
+                               cached_statements=256, factory=CachedConnection)
+        conn.row_factory = sqlite3.Row  # Enable column access by name
+        _apply_pragmas(conn)
+        with _connections_lock:
+            _connections[thread_id] = conn
     return conn
 
+def close_all_connections() -> None:
+    """Close every cached connection (next get_connection() reopens)."""
+    global _wal_enabled
+    with _connections_lock:
+        for conn in _connections.values():
+            sqlite3.Connection.close(conn)
+        _connections.clear()
+        # The file may be swapped out (restore), so re-check WAL on reopen
+        _wal_enabled = False
+
+atexit.register(close_all_connections)
+
+def close_thread_connection() -> None:
+    """Close the current thread's cached connection, e.g. before a worker thread exits."""
+    with _connections_lock:
+        conn = _connections.pop(threading.get_ident(), None)
+    if conn is not None:
+        sqlite3.Connection.close(conn)
+
 def execute_transaction(queries: List[Tuple[str, Tuple]]) -> bool:
     """
     Execute multiple queries in a single transaction.
@@ -24,29 +89,42 @@ def execute_transaction(queries: List[Tuple[str, Tuple]]) -> bool:
     Returns:
         True if all queries succeed, False otherwise
     """
-    conn = None
+    conn = get_connection()
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        for query, params in queries:
-            cursor.execute(query, params)
-        conn.commit()
+        with conn:
+            cursor = conn.cursor()
+            # Consecutive queries sharing the same SQL run as one executemany
+            for query, group in groupby(queries, key=lambda qp: qp[0]):
+                params_list = [params for _, params in group]
+                if len(params_list) == 1:
+                    cursor.execute(query, params_list[0])
+                else:
+                    cursor.executemany(query, params_list)
         return True
     except Exception as e:
-        if conn:
-            conn.rollback()
         print(f"Transaction error: {e}")
         return False
-    finally:
-        if conn:
-            conn.close()
+
+# Oldest SQLite that runs all of the app's SQL: update_inventory_after_sale
+# uses UPDATE ... FROM (3.33), which also covers UPSERT (3.24)
+MIN_SQLITE_VERSION = (3, 33, 0)
 
 def init_db() -> None:
     """Initialize database schema and create default admin user if needed."""
+    if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+        raise RuntimeError(
+            f"SQLite {'.'.join(map(str, MIN_SQLITE_VERSION))} or newer is required, "
+            f"found {sqlite3.sqlite_version}"
+        )
     conn = get_connection()
     cursor = conn.cursor()
+    cursor.row_factory = None  # Only positional access needed here
     
     try:
+        # sqlite3 runs DDL in autocommit mode, so open the transaction
+        # ourselves; the whole schema then commits (and syncs) once
+        cursor.execute("BEGIN IMMEDIATE")
+        
         # Users table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS users (
@@ -67,9 +145,9 @@ def init_db() -> None:
                 name TEXT NOT NULL,
                 description TEXT,
                 milliliters INTEGER DEFAULT 0,
-                cost_price REAL NOT NULL DEFAULT 0,
-                selling_price REAL NOT NULL DEFAULT 0,
-                profit REAL NOT NULL DEFAULT 0,
+                cost_price INTEGER NOT NULL DEFAULT 0,
+                selling_price INTEGER NOT NULL DEFAULT 0,
+                profit INTEGER NOT NULL DEFAULT 0,
                 quantity_stocked INTEGER NOT NULL DEFAULT 0,
                 quantity_sold INTEGER NOT NULL DEFAULT 0,
                 quantity_available INTEGER NOT NULL DEFAULT 0,
@@ -78,12 +156,6 @@ def init_db() -> None:
             )
         """)
         
-        # Add milliliters column if it doesn't exist (for existing databases)
-        try:
-            cursor.execute("ALTER TABLE products ADD COLUMN milliliters INTEGER DEFAULT 0")
-        except sqlite3.OperationalError:
-            pass  # Column already exists
-        
         # Sales table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS sales (
@@ -91,7 +163,7 @@ def init_db() -> None:
                 cashier_id INTEGER NOT NULL,
                 cashier_name TEXT NOT NULL,
                 sale_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                grand_total REAL NOT NULL,
+                grand_total INTEGER NOT NULL,
                 FOREIGN KEY (cashier_id) REFERENCES users(id)
             )
         """)
@@ -104,36 +176,60 @@ def init_db() -> None:
                 product_id TEXT NOT NULL,
                 product_name TEXT NOT NULL,
                 quantity INTEGER NOT NULL,
-                unit_price REAL NOT NULL,
-                line_total REAL NOT NULL,
+                unit_price INTEGER NOT NULL,
+                line_total INTEGER NOT NULL,
                 milliliters INTEGER DEFAULT 0,
                 FOREIGN KEY (sale_id) REFERENCES sales(id) ON DELETE CASCADE,
                 FOREIGN KEY (product_id) REFERENCES products(id)
             )
         """)
         
+        # Add milliliters columns for databases created before they existed;
+        # user_version records that the migration has already run
+        cursor.execute("PRAGMA user_version")
+        if cursor.fetchone()[0] < 1:
+            for table in ("products", "sale_items"):
+                try:
+                    cursor.execute(f"ALTER TABLE {table} ADD COLUMN milliliters INTEGER DEFAULT 0")
+                except sqlite3.OperationalError:
+                    pass  # Column already exists
+            cursor.execute("PRAGMA user_version = 1")
+        
         # Create indexes for performance
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sales_date ON sales(sale_date)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sales_cashier ON sales(cashier_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_products_name ON products(name)")
+        # (sale_date, cashier_id) also serves date-only lookups, so it replaces
+        # the old single-column idx_sales_date
+        cursor.execute("DROP INDEX IF EXISTS idx_sales_date")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sales_date_cashier ON sales(sale_date, cashier_id)")
+        # (cashier_id, sale_date) answers a cashier's sales newest-first
+        # straight from the index and replaces the old idx_sales_cashier
+        cursor.execute("DROP INDEX IF EXISTS idx_sales_cashier")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sales_cashier_date ON sales(cashier_id, sale_date)")
+        # Index entries end with the rowid (sale_items.id), so this also
+        # returns a sale's items in id order without a sort
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_sale_items_sale ON sale_items(sale_id)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_sale_items_product ON sale_items(product_id)")
         
         conn.commit()
         
+        # Refresh planner statistics for new or changed indexes; cheap when
+        # nothing needs analyzing, unlike a full ANALYZE on every start
+        cursor.execute("PRAGMA optimize")
+        
         # Check if admin user exists
         cursor.execute("SELECT COUNT(*) FROM users WHERE role = 'admin'")
         admin_count = cursor.fetchone()[0]
         
         if admin_count == 0:
             # Create default admin user (username: admin, password: admin123)
-            import bcrypt
+            from app.auth import hash_password
             default_password = "admin123"
-            password_hash = bcrypt.hashpw(default_password.encode('utf-8'), bcrypt.gensalt())
+            password_hash = hash_password(default_password)
             
             cursor.execute("""
                 INSERT INTO users (username, password_hash, role, full_name)
                 VALUES (?, ?, ?, ?)
-            """, ("admin", password_hash.decode('utf-8'), "admin", "Administrator"))
+            """, ("admin", password_hash, "admin", "Administrator"))
             conn.commit()
             print("Default admin user created: username='admin', password='admin123'")
         
@@ -144,25 +240,11 @@ def init_db() -> None:
     finally:
         conn.close()
 
-    # Ensure old databases have the milliliters column on sale_items
-    conn = get_connection()
-    try:
-        cursor = conn.cursor()
-        try:
-            cursor.execute("ALTER TABLE sale_items ADD COLUMN milliliters INTEGER DEFAULT 0")
-            conn.commit()
-        except sqlite3.OperationalError:
-            # Column already exists or table missing; ignore
-            pass
-    finally:
-        conn.close()
 
 def test_connection() -> bool:
     """Test database connection."""
     try:
-        conn = get_connection()
-        conn.execute("SELECT 1")
-        conn.close()
+        get_connection().execute("SELECT 1")
         return True
     except Exception as e:
         print(f"Database connection test failed: {e}")
@@ -3,13 +3,14 @@ Inventory management module for Alcohol POS System.
 Admin-only product and stock management.
 """
 from typing import Optional, List, Dict
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, 
-                             QTableWidgetItem, QPushButton, QLineEdit, QLabel,
-                             QDialog, QFormLayout, QDoubleSpinBox, QSpinBox,
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableView, QHeaderView,
+                             QPushButton, QLineEdit, QLabel,
+                             QDialog, QFormLayout, QSpinBox,
                              QTextEdit, QMessageBox)
-from PyQt6.QtCore import Qt
-from app.database import get_connection, execute_transaction
-from app.models import Product, get_product
+from PyQt6.QtCore import (Qt, QAbstractTableModel, QModelIndex, QTimer, QObject,
+                          QThread, pyqtSignal)
+from app.database import get_connection, execute_transaction, close_thread_connection
+from app.models import Product, get_product, invalidate_product_cache
 from app.auth import is_admin, require_admin
 from app.utils import format_currency, validate_product_id, validate_price, validate_quantity, show_error_dialog
 
@@ -51,16 +52,14 @@ class ProductDialog(QDialog):
         layout.addRow("Milliliters:", self.milliliters_input)
         
         # Cost Price
-        self.cost_price_input = QDoubleSpinBox()
-        self.cost_price_input.setMaximum(999999999.99)
-        self.cost_price_input.setDecimals(0)
+        self.cost_price_input = QSpinBox()
+        self.cost_price_input.setMaximum(999999999)
         self.cost_price_input.setPrefix("UGX ")
         layout.addRow("Cost Price:", self.cost_price_input)
         
         # Selling Price
-        self.selling_price_input = QDoubleSpinBox()
-        self.selling_price_input.setMaximum(999999999.99)
-        self.selling_price_input.setDecimals(0)
+        self.selling_price_input = QSpinBox()
+        self.selling_price_input.setMaximum(999999999)
         self.selling_price_input.setPrefix("UGX ")
         layout.addRow("Selling Price:", self.selling_price_input)
         
@@ -129,9 +128,10 @@ class ProductDialog(QDialog):
             'quantity_stocked': self.quantity_input.value()
         }
     
-    def validate(self) -> tuple[bool, str]:
-        """Validate form data."""
-        data = self.get_data()
+    def validate(self, data: Optional[Dict] = None) -> tuple[bool, str]:
+        """Validate form data, or an already-read get_data() snapshot."""
+        if data is None:
+            data = self.get_data()
         
         # Validate ID
         valid, msg = validate_product_id(data['id'])
@@ -161,11 +161,106 @@ class ProductDialog(QDialog):
         
         return True, ""
 
+class ProductsTableModel(QAbstractTableModel):
+    """Table model over product rows; cells are formatted only when displayed."""
+    
+    HEADERS = [
+        "ID", "Name", "MLs", "Cost Price", "Selling Price", "Profit",
+        "Stocked", "Sold", "Available", "Description"
+    ]
+    
+    # One formatter per column, indexing rows by position in ProductFetcher's
+    # SELECT: id, name, description, milliliters, cost_price, selling_price,
+    # profit, quantity_stocked, quantity_sold, quantity_available
+    _FORMATTERS = (
+        lambda row: str(row[0]),
+        lambda row: row[1],
+        lambda row: f"{row[3]} ml" if row[3] else "-",
+        lambda row: format_currency(row[4]),
+        lambda row: format_currency(row[5]),
+        lambda row: format_currency(row[6]),
+        lambda row: str(row[7]),
+        lambda row: str(row[8]),
+        lambda row: str(row[9]),
+        lambda row: row[2] or "",
+    )
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+    
+    def set_rows(self, rows) -> None:
+        """Replace the model's rows."""
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+    
+    def append_rows(self, rows) -> None:
+        """Append a batch of rows to the end of the model."""
+        start = len(self._rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+        self._rows.extend(rows)
+        self.endInsertRows()
+    
+    def row_at(self, row: int):
+        """Get the product row at a table row index."""
+        return self._rows[row]
+    
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+    
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+    
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        
+        return self._FORMATTERS[index.column()](self._rows[index.row()])
+
+class ProductFetcher(QObject):
+    """Worker that loads the product list off the GUI thread in batches."""
+    
+    rowsReady = pyqtSignal(list)
+    finished = pyqtSignal()
+    
+    BATCH_SIZE = 200
+    
+    def run(self):
+        """Query products and emit them in batches of BATCH_SIZE rows."""
+        try:
+            cursor = get_connection().cursor()
+            cursor.execute("""
+                SELECT id, name, description, milliliters, cost_price, selling_price, profit,
+                       quantity_stocked, quantity_sold, quantity_available
+                FROM products
+                ORDER BY name
+            """)
+            while True:
+                batch = cursor.fetchmany(self.BATCH_SIZE)
+                if not batch:
+                    break
+                self.rowsReady.emit(batch)
+        except Exception as e:
+            print(f"Error loading products: {e}")
+        finally:
+            close_thread_connection()
+            self.finished.emit()
+
 class InventoryWindow(QWidget):
     """Inventory management window (Admin only)."""
     
     def __init__(self, parent=None):
         super().__init__(parent)
+        self._fetch_thread = None
+        self._fetcher = None
+        self._refresh_pending = False
+        
         if not is_admin():
             show_error_dialog(self, "Access Denied", "Admin access required")
             return
@@ -213,22 +308,27 @@ class InventoryWindow(QWidget):
         layout.addLayout(button_layout)
         
         # Table
-        self.table = QTableWidget()
-        self.table.setColumnCount(10)
-        self.table.setHorizontalHeaderLabels([
-            "ID", "Name", "MLs", "Cost Price", "Selling Price", "Profit",
-            "Stocked", "Sold", "Available", "Description"
-        ])
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.model = ProductsTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QTableView.SelectionMode.SingleSelection)
+        self.table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        # Fixed column widths; sizing to contents would measure every cell
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        for column, width in enumerate([120, 200, 70, 110, 110, 100, 70, 70, 80]):
+            self.table.setColumnWidth(column, width)
+        header.setStretchLastSection(True)
+        self.table.setSortingEnabled(False)
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 border: 2px solid #ccc;
                 gridline-color: #e0e0e0;
                 background-color: white;
                 selection-background-color: #4CAF50;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #4CAF50;
                 color: white;
             }
@@ -248,48 +348,56 @@ class InventoryWindow(QWidget):
         self.refresh_table()
     
     def refresh_table(self):
-        """Refresh product table."""
-        conn = get_connection()
-        try:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, name, description, milliliters, cost_price, selling_price, profit,
-                       quantity_stocked, quantity_sold, quantity_available
-                FROM products
-                ORDER BY name
-            """)
-            
-            rows = cursor.fetchall()
-            self.table.setRowCount(len(rows))
-            
-            for row_idx, row in enumerate(rows):
-                self.table.setItem(row_idx, 0, QTableWidgetItem(str(row['id'])))
-                self.table.setItem(row_idx, 1, QTableWidgetItem(row['name']))
-                # Handle milliliters - may not exist in older databases
-                try:
-                    mls = row['milliliters'] if row['milliliters'] is not None else 0
-                except (KeyError, IndexError):
-                    mls = 0
-                mls_str = f"{mls} ml" if mls > 0 else "-"
-                self.table.setItem(row_idx, 2, QTableWidgetItem(mls_str))
-                self.table.setItem(row_idx, 3, QTableWidgetItem(format_currency(row['cost_price'])))
-                self.table.setItem(row_idx, 4, QTableWidgetItem(format_currency(row['selling_price'])))
-                self.table.setItem(row_idx, 5, QTableWidgetItem(format_currency(row['profit'])))
-                self.table.setItem(row_idx, 6, QTableWidgetItem(str(row['quantity_stocked'])))
-                self.table.setItem(row_idx, 7, QTableWidgetItem(str(row['quantity_sold'])))
-                self.table.setItem(row_idx, 8, QTableWidgetItem(str(row['quantity_available'])))
-                self.table.setItem(row_idx, 9, QTableWidgetItem(row['description'] or ""))
-            
-            self.table.resizeColumnsToContents()
-        finally:
-            conn.close()
+        """Refresh product table; rows are loaded on a worker thread."""
+        if self._fetch_thread is not None:
+            # A load is already running; reload again once it finishes
+            self._refresh_pending = True
+            return
+        
+        self.model.set_rows([])
+        
+        thread = QThread(self)
+        fetcher = ProductFetcher()
+        fetcher.moveToThread(thread)
+        thread.started.connect(fetcher.run)
+        fetcher.rowsReady.connect(self.model.append_rows)
+        fetcher.finished.connect(thread.quit)
+        thread.finished.connect(self._on_fetch_finished)
+        thread.finished.connect(fetcher.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+        
+        self._fetch_thread = thread
+        self._fetcher = fetcher
+        thread.start()
+    
+    def _on_fetch_finished(self):
+        """Clear the finished load and start any refresh requested meanwhile."""
+        self._fetch_thread = None
+        self._fetcher = None
+        if self._refresh_pending:
+            self._refresh_pending = False
+            self.refresh_table()
+    
+    def closeEvent(self, event):
+        """Wait for a running load so its thread isn't destroyed mid-query."""
+        if self._fetch_thread is not None:
+            self._fetch_thread.quit()
+            self._fetch_thread.wait()
+        super().closeEvent(event)
+    
+    def _selected_row(self):
+        """Get the product row for the current selection, if any."""
+        selected = self.table.selectionModel().selectedRows()
+        if not selected:
+            return None
+        return self.model.row_at(selected[0].row())
     
     def add_product(self):
         """Open dialog to add new product."""
         dialog = ProductDialog(self)
         if dialog.exec():
             data = dialog.get_data()
-            valid, msg = dialog.validate()
+            valid, msg = dialog.validate(data)
             if not valid:
                 show_error_dialog(self, "Validation Error", msg)
                 return
@@ -311,23 +419,22 @@ class InventoryWindow(QWidget):
                 self.refresh_table()
                 QMessageBox.information(self, "Success", "Product added successfully")
             except Exception as e:
+                conn.rollback()
                 show_error_dialog(self, "Error", f"Failed to add product: {str(e)}")
-            finally:
-                conn.close()
     
     def edit_product(self):
         """Edit selected product."""
-        selected = self.table.selectedItems()
-        if not selected:
+        row = self._selected_row()
+        if row is None:
             show_error_dialog(self, "No Selection", "Please select a product to edit")
             return
         
-        product_id = self.table.item(selected[0].row(), 0).text()
+        product_id = row['id']
         dialog = ProductDialog(self, product_id)
         
         if dialog.exec():
             data = dialog.get_data()
-            valid, msg = dialog.validate()
+            valid, msg = dialog.validate(data)
             if not valid:
                 show_error_dialog(self, "Validation Error", msg)
                 return
@@ -359,39 +466,51 @@ class InventoryWindow(QWidget):
                       data['selling_price'], profit, data['quantity_stocked'],
                       new_quantity_available, product_id))
                 conn.commit()
+                invalidate_product_cache(product_id)
                 self.refresh_table()
                 QMessageBox.information(self, "Success", "Product updated successfully")
             except Exception as e:
+                conn.rollback()
                 show_error_dialog(self, "Error", f"Failed to update product: {str(e)}")
-            finally:
-                conn.close()
     
     def delete_product(self):
         """Delete selected product."""
-        selected = self.table.selectedItems()
-        if not selected:
+        row = self._selected_row()
+        if row is None:
             show_error_dialog(self, "No Selection", "Please select a product to delete")
             return
         
-        product_id = self.table.item(selected[0].row(), 0).text()
-        product_name = self.table.item(selected[0].row(), 1).text()
+        product_id = row['id']
+        product_name = row['name']
         
-        reply = QMessageBox.question(
-            self, "Confirm Delete",
+        # Ask without blocking the event loop; the delete runs from the signal
+        box = QMessageBox(
+            QMessageBox.Icon.Question, "Confirm Delete",
             f"Are you sure you want to delete '{product_name}'?\n\nThis action cannot be undone.",
-            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, self
+        )
+        box.setDefaultButton(QMessageBox.StandardButton.No)
+        box.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        box.buttonClicked.connect(
+            lambda button: self._on_delete_confirmed(box.standardButton(button), product_id)
         )
+        box.open()
+    
+    def _on_delete_confirmed(self, button: QMessageBox.StandardButton, product_id: str):
+        """Delete the product once the confirmation box is answered with Yes."""
+        if button != QMessageBox.StandardButton.Yes:
+            return
         
-        if reply == QMessageBox.StandardButton.Yes:
-            conn = get_connection()
-            try:
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM products WHERE id = ?", (product_id,))
-                conn.commit()
-                self.refresh_table()
-                QMessageBox.information(self, "Success", "Product deleted successfully")
-            except Exception as e:
-                show_error_dialog(self, "Error", f"Failed to delete product: {str(e)}")
-            finally:
-                conn.close()
+        conn = get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM products WHERE id = ?", (product_id,))
+            conn.commit()
+            invalidate_product_cache(product_id)
+            # Let the dialog close and repaint before the table reloads
+            QTimer.singleShot(0, self.refresh_table)
+            QMessageBox.information(self, "Success", "Product deleted successfully")
+        except Exception as e:
+            conn.rollback()
+            show_error_dialog(self, "Error", f"Failed to delete product: {str(e)}")
 
@@ -4,18 +4,18 @@ Handles application initialization, database setup, and window routing.
 """
 import sys
 import os
+import re
 from pathlib import Path
 from PyQt6.QtWidgets import QApplication, QMessageBox
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QIcon
 
 # Add app directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from app.config import BASE_DIR, DATA_DIR, DB_PATH
+from app.config import BASE_DIR, DB_PATH
 from app.database import init_db, test_connection
 from app.auth import login, logout
-from app.pos import POSWindow
 
 class LoginWindow:
     """Simple login window using QMessageBox for input."""
@@ -114,32 +114,56 @@ def check_admin_privileges():
     except:
         return True  # Assume admin if check fails
 
-def main():
-    """Main application entry point."""
-    # Create Qt application
-    app = QApplication(sys.argv)
-    app.setApplicationName("PiteYelaHouseofWine_POS")
-    app.setQuitOnLastWindowClosed(True)
+def get_assets_dir() -> Path:
+    """Get the assets folder for both development and PyInstaller bundle paths."""
+    if getattr(sys, 'frozen', False):
+        # Running as bundled executable
+        return Path(sys._MEIPASS) / "assets"
+    # Running from source
+    return Path(__file__).parent.parent / "assets"
+
+def compact_qss(text: str) -> str:
+    """Strip comments and redundant whitespace from a Qt stylesheet."""
+    text = re.sub(r"/\*.*?\*/", "", text, flags=re.DOTALL)
+    text = re.sub(r"\s+", " ", text)
+    return re.sub(r"\s*([{};:,>])\s*", r"\1", text).strip()
+
+def write_compact_stylesheet() -> Path:
+    """Write assets/styles.min.qss from styles.qss (run at build time)."""
+    assets_dir = get_assets_dir()
+    source = (assets_dir / "styles.qss").read_text(encoding='utf-8')
+    target = assets_dir / "styles.min.qss"
+    target.write_text(compact_qss(source), encoding='utf-8')
+    return target
+
+def load_stylesheet(app: QApplication) -> None:
+    """
+    Load the application stylesheet, preferring the build-time compacted copy.
     
-    # Load stylesheet
+    From source the compacted copy is used only while it is at least as new
+    as styles.qss, so edits made after a build still take effect.
+    """
     try:
-        from pathlib import Path
-        # Handle both development and PyInstaller bundle paths
-        if getattr(sys, 'frozen', False):
-            # Running as bundled executable
-            bundle_dir = Path(sys._MEIPASS)
-            stylesheet_path = bundle_dir / "assets" / "styles.qss"
-        else:
-            # Running from source
-            stylesheet_path = Path(__file__).parent.parent / "assets" / "styles.qss"
+        assets_dir = get_assets_dir()
+        source_path = assets_dir / "styles.qss"
+        stylesheet_path = assets_dir / "styles.min.qss"
+        if not stylesheet_path.exists():
+            stylesheet_path = source_path
+        elif not getattr(sys, 'frozen', False) and source_path.exists():
+            if stylesheet_path.stat().st_mtime < source_path.stat().st_mtime:
+                stylesheet_path = source_path
         if stylesheet_path.exists():
             with open(stylesheet_path, 'r', encoding='utf-8') as f:
                 app.setStyleSheet(f.read())
     except Exception as e:
         print(f"Warning: Could not load stylesheet: {e}")
-    
-    # Ensure data directory exists
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
+
+def main():
+    """Main application entry point."""
+    # Create Qt application
+    app = QApplication(sys.argv)
+    app.setApplicationName("PiteYelaHouseofWine_POS")
+    app.setQuitOnLastWindowClosed(True)
     
     # Initialize database
     try:
@@ -164,11 +188,15 @@ def main():
         # User cancelled login
         return 0
     
-    # Show POS window
+    # Show POS window; it and the stylesheet are only needed after login
     try:
+        from app.pos import POSWindow
         pos_window = POSWindow()
         pos_window.show()
         
+        # Apply the stylesheet once the first frame has painted
+        QTimer.singleShot(0, lambda: load_stylesheet(app))
+        
         # Run application
         return app.exec()
     except Exception as e:
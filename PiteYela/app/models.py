@@ -2,26 +2,67 @@
 Business logic and data models for Alcohol POS System.
 Contains product calculations, inventory updates, and sales validation.
 """
+import json
+import time
 from typing import Optional, Dict, List, Tuple
 from app.database import get_connection, execute_transaction
 
+# Hot statements kept as constants so repeat calls hit the connection's
+# statement cache
+_GET_PRODUCT_SQL = """
+    SELECT id, name, description, milliliters, cost_price, selling_price,
+           quantity_stocked, quantity_sold
+    FROM products
+    WHERE id = ?
+"""
+
+# Takes a JSON array of [product_id, quantity] pairs and updates every
+# product in one statement; repeated IDs are summed
+_UPDATE_INVENTORY_SQL = """
+    WITH v(pid, qty) AS (
+        SELECT json_extract(value, '$[0]'), SUM(json_extract(value, '$[1]'))
+        FROM json_each(?)
+        GROUP BY 1
+    )
+    UPDATE products
+    SET quantity_sold = quantity_sold + v.qty,
+        updated_at = CURRENT_TIMESTAMP
+    FROM v
+    WHERE products.id = v.pid
+"""
+
+# Products from a JSON array of IDs whose stock has gone negative
+_OVERSOLD_SQL = """
+    SELECT p.id
+    FROM products p
+    JOIN json_each(?) j ON p.id = j.value
+    WHERE p.quantity_stocked - p.quantity_sold < 0
+"""
+
+_INSERT_SALE_ITEM_SQL = """
+    INSERT INTO sale_items (sale_id, product_id, product_name, quantity, unit_price, line_total, milliliters)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
 class Product:
     """Product model with auto-calculated fields."""
     
     def __init__(self, product_id: str, name: str, description: str = "",
-                 milliliters: int = 0, cost_price: float = 0.0, selling_price: float = 0.0,
+                 milliliters: int = 0, cost_price: int = 0, selling_price: int = 0,
                  quantity_stocked: int = 0, quantity_sold: int = 0):
         self.id = product_id
         self.name = name
         self.description = description
         self.milliliters = milliliters
-        self.cost_price = cost_price
-        self.selling_price = selling_price
+        # Prices are whole shillings; databases created before the INTEGER
+        # price columns still hand back floats
+        self.cost_price = int(cost_price)
+        self.selling_price = int(selling_price)
         self.quantity_stocked = quantity_stocked
         self.quantity_sold = quantity_sold
         
     @property
-    def profit(self) -> float:
+    def profit(self) -> int:
         """Auto-calculated profit per unit."""
         return self.selling_price - self.cost_price
     
@@ -45,39 +86,43 @@ class Product:
             'quantity_available': self.quantity_available
         }
 
+# Short-lived cache of product lookups, so repeated scans of the same
+# barcode skip the database; every write to products invalidates it
+_PRODUCT_CACHE_TTL = 2.0
+_product_cache: Dict[str, Tuple[float, Product]] = {}
+
+def invalidate_product_cache(product_id: Optional[str] = None) -> None:
+    """Drop one cached product, or all of them when no ID is given."""
+    if product_id is None:
+        _product_cache.clear()
+    else:
+        _product_cache.pop(product_id, None)
+
 def get_product(product_id: str) -> Optional[Product]:
     """Get product by ID."""
-    conn = get_connection()
-    try:
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT id, name, description, milliliters, cost_price, selling_price,
-                   quantity_stocked, quantity_sold
-            FROM products
-            WHERE id = ?
-        """, (product_id,))
-        
-        row = cursor.fetchone()
-        if row:
-            # Handle milliliters - may not exist in older databases
-            try:
-                milliliters = row['milliliters'] if row['milliliters'] is not None else 0
-            except (KeyError, IndexError):
-                milliliters = 0
-            
-            return Product(
-                product_id=row['id'],
-                name=row['name'],
-                description=row['description'] or "",
-                milliliters=milliliters,
-                cost_price=row['cost_price'],
-                selling_price=row['selling_price'],
-                quantity_stocked=row['quantity_stocked'],
-                quantity_sold=row['quantity_sold']
-            )
-        return None
-    finally:
-        conn.close()
+    cached = _product_cache.get(product_id)
+    now = time.monotonic()
+    if cached is not None and now - cached[0] < _PRODUCT_CACHE_TTL:
+        return cached[1]
+    
+    cursor = get_connection().cursor()
+    cursor.execute(_GET_PRODUCT_SQL, (product_id,))
+    
+    row = cursor.fetchone()
+    if row:
+        product = Product(
+            product_id=row['id'],
+            name=row['name'],
+            description=row['description'] or "",
+            milliliters=row['milliliters'] or 0,
+            cost_price=row['cost_price'],
+            selling_price=row['selling_price'],
+            quantity_stocked=row['quantity_stocked'],
+            quantity_sold=row['quantity_sold']
+        )
+        _product_cache[product_id] = (now, product)
+        return product
+    return None
 
 def validate_stock_availability(product_id: str, requested_quantity: int) -> Tuple[bool, str]:
     """
@@ -95,36 +140,60 @@ def validate_stock_availability(product_id: str, requested_quantity: int) -> Tup
     
     return True, ""
 
-def calculate_line_total(unit_price: float, quantity: int) -> float:
+def validate_stock_availability_bulk(items: List[Dict]) -> Tuple[bool, List[Tuple[str, int]]]:
+    """
+    Validate stock for every item in a cart with a single query.
+    
+    Args:
+        items: List of item dicts with keys: product_id, quantity
+        
+    Returns:
+        (all_valid, shortages) where shortages lists (product_id, available)
+        for each product whose requested quantity exceeds its stock
+    """
+    requested: Dict[str, int] = {}
+    for item in items:
+        requested[item['product_id']] = requested.get(item['product_id'], 0) + item['quantity']
+    
+    cursor = get_connection().cursor()
+    cursor.execute("""
+        SELECT p.id, p.quantity_stocked - p.quantity_sold AS available
+        FROM products p
+        JOIN json_each(?) j ON p.id = j.value
+    """, (json.dumps(list(requested)),))
+    available = {row['id']: row['available'] for row in cursor.fetchall()}
+    
+    shortages = [(product_id, available.get(product_id, 0))
+                 for product_id, quantity in requested.items()
+                 if available.get(product_id, 0) < quantity]
+    return not shortages, shortages
+
+def calculate_line_total(unit_price: int, quantity: int) -> int:
     """Calculate line total for an item."""
-    return round(unit_price * quantity, 2)
+    return unit_price * quantity
 
-def calculate_grand_total(items: List[Dict]) -> float:
+def calculate_grand_total(items: List[Dict]) -> int:
     """
     Calculate grand total from list of items.
     
-    Each item dict should have: {'unit_price': float, 'quantity': int}
+    Each item dict should have: {'unit_price': int, 'quantity': int}
     """
-    total = 0.0
-    for item in items:
-        total += calculate_line_total(item['unit_price'], item['quantity'])
-    return round(total, 2)
+    return sum(item['unit_price'] * item['quantity'] for item in items)
 
-def update_inventory_after_sale(product_id: str, quantity_sold: int) -> bool:
+def update_inventory_after_sale(updates: List[Tuple[str, int]]) -> bool:
     """
     Update inventory after a sale.
-    Atomically updates quantity_sold and quantity_available.
-    """
-    queries = [
-        ("""
-            UPDATE products
-            SET quantity_sold = quantity_sold + ?,
-                updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        """, (quantity_sold, product_id))
-    ]
+    Atomically adds each quantity to its product's quantity_sold.
     
-    return execute_transaction(queries)
+    Args:
+        updates: List of (product_id, quantity_sold) pairs
+    """
+    success = execute_transaction([(_UPDATE_INVENTORY_SQL, (json.dumps(updates),))])
+    # Only after the commit, so no lookup in between can re-cache old stock
+    if success:
+        for product_id, _ in updates:
+            invalidate_product_cache(product_id)
+    return success
 
 def create_sale(cashier_id: int, cashier_name: str, items: List[Dict]) -> Optional[int]:
     """
@@ -138,13 +207,25 @@ def create_sale(cashier_id: int, cashier_name: str, items: List[Dict]) -> Option
     Returns:
         Sale ID if successful, None otherwise
     """
-    # Calculate grand total
-    grand_total = sum(item['line_total'] for item in items)
+    # Gather the grand total, inventory updates and distinct product IDs
+    # in a single pass over the cart
+    grand_total = 0
+    inventory_updates = []
+    product_ids = set()
+    for item in items:
+        grand_total += item['line_total']
+        inventory_updates.append((item['product_id'], item['quantity']))
+        product_ids.add(item['product_id'])
+    
+    product_ids_json = json.dumps(list(product_ids))
     
     conn = get_connection()
     try:
         cursor = conn.cursor()
         
+        # Take the write lock up front so the whole sale commits once
+        conn.execute("BEGIN IMMEDIATE")
+        
         # Insert sale
         cursor.execute("""
             INSERT INTO sales (cashier_id, cashier_name, grand_total)
@@ -153,86 +234,90 @@ def create_sale(cashier_id: int, cashier_name: str, items: List[Dict]) -> Option
         
         sale_id = cursor.lastrowid
         
-        # Insert sale items - batch process for speed
-        # Get all products at once to minimize database queries
-        product_cache = {}
-        for item in items:
-            if item['product_id'] not in product_cache:
-                product = get_product(item['product_id'])
-                product_cache[item['product_id']] = getattr(product, 'milliliters', 0) if product else 0
+        # Look up milliliters for every product in the cart with one query
+        cursor.execute("""
+            SELECT p.id, p.milliliters
+            FROM products p
+            JOIN json_each(?) j ON p.id = j.value
+        """, (product_ids_json,))
+        product_cache = {row['id']: row['milliliters'] or 0 for row in cursor.fetchall()}
+        
+        # Insert all sale items in one batch
+        cursor.executemany(_INSERT_SALE_ITEM_SQL, [
+            (sale_id, item['product_id'], item['product_name'], item['quantity'],
+             item['unit_price'], item['line_total'], product_cache.get(item['product_id'], 0))
+            for item in items
+        ])
         
-        # Insert all sale items in batch
-        for item in items:
-            milliliters = product_cache.get(item['product_id'], 0)
-            cursor.execute("""
-                INSERT INTO sale_items (sale_id, product_id, product_name, quantity, unit_price, line_total, milliliters)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (sale_id, item['product_id'], item['product_name'], 
-                  item['quantity'], item['unit_price'], item['line_total'], milliliters))
+        # Update inventory for all items on the same connection so the
+        # sale and its stock changes commit together
+        cursor.execute(_UPDATE_INVENTORY_SQL, (json.dumps(inventory_updates),))
         
-
-        # Update inventory for all items using the same DB connection/cursor
-        # to avoid SQLite "database is locked" errors from parallel connections.
-        for item in items:
-            cursor.execute("""
-                UPDATE products
-                SET quantity_sold = quantity_sold + ?,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-            """, (item['quantity'], item['product_id']))
+        # The caller's stock check ran before this transaction, so another
+        # sale may have taken the stock since; the write lock makes this
+        # check final
+        cursor.execute(_OVERSOLD_SQL, (product_ids_json,))
+        oversold = [row[0] for row in cursor.fetchall()]
+        if oversold:
+            raise ValueError(f"Insufficient stock for {', '.join(oversold)}")
         
         conn.commit()
+        for product_id in product_ids:
+            invalidate_product_cache(product_id)
         return sale_id
     except Exception as e:
         conn.rollback()
         print(f"Error creating sale: {e}")
         return None
-    finally:
-        conn.close()
 
-def get_sale_details(sale_id: int) -> Optional[Dict]:
-    """Get complete sale details including items."""
-    conn = get_connection()
-    try:
-        cursor = conn.cursor()
-        
-        # Get sale info
-        cursor.execute("""
-            SELECT id, cashier_id, cashier_name, sale_date, grand_total
-            FROM sales
-            WHERE id = ?
-        """, (sale_id,))
-        
-        sale_row = cursor.fetchone()
-        if not sale_row:
-            return None
-        
-        # Get sale items
-        cursor.execute("""
-            SELECT product_id, product_name, quantity, unit_price, line_total, milliliters
-            FROM sale_items
-            WHERE sale_id = ?
-            ORDER BY id
-        """, (sale_id,))
+def get_sales_details_bulk(sale_ids: List[int]) -> Dict[int, Dict]:
+    """
+    Get complete details for several sales with a single query.
+    
+    Args:
+        sale_ids: IDs of the sales to load
         
-        items = []
-        for row in cursor.fetchall():
-            item_dict = dict(row)
-            # Handle milliliters - may not exist in older databases
-            try:
-                item_dict['milliliters'] = row['milliliters'] if row['milliliters'] is not None else 0
-            except (KeyError, IndexError):
-                item_dict['milliliters'] = 0
-            items.append(item_dict)
+    Returns:
+        Dict mapping sale ID to the same structure get_sale_details returns;
+        IDs with no matching sale are left out
+    """
+    cursor = get_connection().cursor()
+    cursor.execute("""
+        SELECT s.id, s.cashier_id, s.cashier_name, s.sale_date, s.grand_total,
+               si.id AS item_id, si.product_id, si.product_name, si.quantity,
+               si.unit_price, si.line_total, si.milliliters
+        FROM sales s
+        JOIN json_each(?) j ON s.id = j.value
+        LEFT JOIN sale_items si ON si.sale_id = s.id
+        ORDER BY s.id, si.id
+    """, (json.dumps(list(sale_ids)),))
+    
+    sales: Dict[int, Dict] = {}
+    for row in cursor.fetchall():
+        sale = sales.get(row['id'])
+        if sale is None:
+            sale = sales[row['id']] = {
+                'sale_id': row['id'],
+                'cashier_id': row['cashier_id'],
+                'cashier_name': row['cashier_name'],
+                'sale_date': row['sale_date'],
+                'grand_total': row['grand_total'],
+                'items': []
+            }
         
-        return {
-            'sale_id': sale_row['id'],
-            'cashier_id': sale_row['cashier_id'],
-            'cashier_name': sale_row['cashier_name'],
-            'sale_date': sale_row['sale_date'],
-            'grand_total': sale_row['grand_total'],
-            'items': items
-        }
-    finally:
-        conn.close()
+        # A sale without items still yields one row from the LEFT JOIN
+        if row['item_id'] is not None:
+            sale['items'].append({
+                'product_id': row['product_id'],
+                'product_name': row['product_name'],
+                'quantity': row['quantity'],
+                'unit_price': row['unit_price'],
+                'line_total': row['line_total'],
+                'milliliters': row['milliliters'] or 0
+            })
+    
+    return sales
 
+def get_sale_details(sale_id: int) -> Optional[Dict]:
+    """Get complete sale details including items."""
+    return get_sales_details_bulk([sale_id]).get(sale_id)
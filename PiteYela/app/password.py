@@ -4,8 +4,7 @@ Allows users to change their own password.
 """
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QFormLayout, QLineEdit,
                              QPushButton, QLabel, QMessageBox)
-from app.database import get_connection
-from app.auth import get_current_user, verify_password, hash_password
+from app.auth import get_current_user, change_password
 from app.utils import show_error_dialog, show_info_dialog
 
 class PasswordChangeDialog(QDialog):
@@ -13,6 +12,7 @@ class PasswordChangeDialog(QDialog):
     
     def __init__(self, parent=None):
         super().__init__(parent)
+        self._current_user = get_current_user()
         self.setWindowTitle("PiteYelaHouseofWine_POS - Change Password")
         self.setModal(True)
         self.resize(400, 200)
@@ -73,7 +73,7 @@ class PasswordChangeDialog(QDialog):
     
     def change_password(self):
         """Change the password."""
-        current_user = get_current_user()
+        current_user = self._current_user
         if not current_user:
             show_error_dialog(self, "Error", "User session expired. Please login again.")
             self.reject()
@@ -100,30 +100,19 @@ class PasswordChangeDialog(QDialog):
             show_error_dialog(self, "Validation Error", "New passwords do not match")
             return
         
-        # Verify current password
-        conn = get_connection()
-        try:
-            cursor = conn.cursor()
-            cursor.execute("SELECT password_hash FROM users WHERE id = ?", (current_user['id'],))
-            row = cursor.fetchone()
-            
-            if not row or not verify_password(current_password, row['password_hash']):
-                show_error_dialog(self, "Error", "Current password is incorrect")
-                self.current_password_input.clear()
-                self.current_password_input.setFocus()
-                return
-            
-            # Update password
-            new_password_hash = hash_password(new_password)
-            cursor.execute("UPDATE users SET password_hash = ? WHERE id = ?",
-                         (new_password_hash, current_user['id']))
-            conn.commit()
-            
-            show_info_dialog(self, "Success", "Password changed successfully!")
-            self.accept()
-            
-        except Exception as e:
-            show_error_dialog(self, "Error", f"Failed to change password: {str(e)}")
-        finally:
-            conn.close()
+        # Nothing to change; skip the bcrypt check and the database write
+        if new_password == current_password:
+            show_error_dialog(self, "Validation Error", "New password must differ from the current password")
+            return
+        
+        # Verify the current password and store the new one
+        success, message = change_password(current_user['id'], current_password, new_password)
+        if not success:
+            show_error_dialog(self, "Error", message)
+            self.current_password_input.clear()
+            self.current_password_input.setFocus()
+            return
+        
+        show_info_dialog(self, "Success", "Password changed successfully!")
+        self.accept()
 
@@ -2,39 +2,168 @@
 Point of Sale (POS) interface for Alcohol POS System.
 Main screen for processing sales, scanning products, and printing receipts.
 """
+import queue
+import threading
+import time
 from typing import List, Dict, Optional
 from datetime import datetime
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableWidget,
                              QTableWidgetItem, QPushButton, QLineEdit, QLabel,
                              QSpinBox, QMessageBox, QGroupBox, QHeaderView)
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtCore import Qt, QTimer, QObject, QRunnable, QThreadPool, pyqtSignal
 from PyQt6.QtGui import QKeyEvent
-from app.models import get_product, validate_stock_availability, calculate_line_total, calculate_grand_total, create_sale
+from app.models import (get_product, validate_stock_availability, validate_stock_availability_bulk,
+                        calculate_line_total, calculate_grand_total, create_sale)
+from app.database import close_thread_connection
 from app.auth import get_current_user, is_admin
 from app.printer import print_receipt, reprint_last_receipt
 from app.utils import format_currency, show_error_dialog, show_info_dialog, show_question_dialog
+from app.settings_store import get_cached_settings
 from app.config import SHOP_NAME, RECEIPT_ALCOHOL_WARNING
 
+# Stylesheets for the POS window's widgets, defined once at import time
+_GROUPBOX_CSS = """
+    QGroupBox {
+        border: 2px solid #ccc;
+        border-radius: 0px;
+        margin-top: 10px;
+        padding-top: 15px;
+        background-color: white;
+    }
+    QGroupBox::title {
+        subcontrol-origin: margin;
+        left: 10px;
+        padding: 0 5px;
+        background-color: white;
+    }
+"""
+
+_PRIMARY_BTN_CSS = """
+    QPushButton {
+        background-color: #2196F3;
+        color: white;
+        border: 2px solid #1976D2;
+        font-weight: bold;
+        padding: 8px;
+        border-radius: 0px;
+    }
+    QPushButton:hover {
+        background-color: #4CAF50;
+        border: 2px solid #45a049;
+    }
+"""
+
+_SECONDARY_BTN_CSS = """
+    QPushButton {
+        background-color: white;
+        color: black;
+        border: 2px solid #000000;
+        padding: 8px 16px;
+        border-radius: 0px;
+    }
+    QPushButton:hover {
+        background-color: #f0f0f0;
+        border: 2px solid #000000;
+    }
+"""
+
+_COMPLETE_BTN_CSS = """
+    QPushButton {
+        background-color: white;
+        color: black;
+        border: 2px solid #000000;
+        font-weight: bold;
+        padding: 10px;
+        font-size: 14px;
+        border-radius: 0px;
+    }
+    QPushButton:hover {
+        background-color: #f0f0f0;
+        border: 2px solid #000000;
+    }
+"""
+
+def _printer_loop(print_queue: "queue.Queue"):
+    """Print queued receipts one at a time, for the life of the process."""
+    while True:
+        sale_data, printer_type = print_queue.get()
+        try:
+            print_receipt(sale_data, printer_type=printer_type)
+        except Exception as e:
+            print(f"Receipt printing error (background): {e}")
+
+class SaleSignals(QObject):
+    """Signals for SaleWorker; QRunnable itself can't carry signals."""
+    
+    # Sale ID (None on failure) and the items that were submitted
+    finished = pyqtSignal(object, list)
+
+class SaleWorker(QRunnable):
+    """Runnable that writes a completed sale off the GUI thread."""
+    
+    def __init__(self, cashier_id: int, cashier_name: str, items: List[Dict]):
+        super().__init__()
+        self.cashier_id = cashier_id
+        self.cashier_name = cashier_name
+        self.items = items
+        self.signals = SaleSignals()
+    
+    def run(self):
+        """Create the sale and report the result back to the GUI thread."""
+        sale_id = None
+        try:
+            sale_id = create_sale(
+                cashier_id=self.cashier_id,
+                cashier_name=self.cashier_name,
+                items=self.items
+            )
+        finally:
+            close_thread_connection()
+            self.signals.finished.emit(sale_id, self.items)
+
 class POSWindow(QWidget):
     """Main POS interface window."""
     
+    # Seconds a scan's stock check stays good for the following add
+    VALIDATION_TTL = 0.5
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("PiteYelaHouseofWine_POS - Point of Sale")
         self.resize(1000, 700)
         self.setStyleSheet("background-color: white;")
         
+        # Session state; the user can't change while this window is open
+        self._current_user = get_current_user()
+        self._is_admin = is_admin()
+        
         # Cart data
         self.cart: List[Dict] = []
+        # product_id -> row in self.cart
+        self._cart_index: Dict[str, int] = {}
         self.current_product_id = ""
         self.current_quantity = 1
+        # Product looked up by the last scan, reused when it is added
+        self._pending_product = None
+        # (product_id, quantity, time) of the last successful stock check
+        self._validated_token = None
+        self._resize_pending = False
+        # Running total of the cart's line totals
+        self._grand_total = 0
+        # Loaded once; SettingsWindow tells us when it saves new values
+        self._settings = get_cached_settings()
+        # Receipts are handed to a single printer thread so they print in order
+        self._print_queue = queue.Queue()
+        threading.Thread(target=_printer_loop, args=(self._print_queue,), daemon=True).start()
+        # Signal holders of sales still being written, kept alive until they report
+        self._pending_sales = set()
         
         # Layout
         main_layout = QVBoxLayout()
         
         # Header
         header_layout = QHBoxLayout()
-        user = get_current_user()
+        user = self._current_user
         self.user_label = QLabel(f"Cashier: {user['full_name'] if user else 'Unknown'}")
         self.user_label.setStyleSheet("font-size: 14px; font-weight: bold;")
         header_layout.addWidget(self.user_label)
@@ -45,7 +174,7 @@ class POSWindow(QWidget):
         self.password_btn.clicked.connect(self.change_password)
         header_layout.addWidget(self.password_btn)
         
-        if is_admin():
+        if self._is_admin:
             self.admin_menu_btn = QPushButton("Admin Menu")
             self.admin_menu_btn.clicked.connect(self.show_admin_menu)
             header_layout.addWidget(self.admin_menu_btn)
@@ -54,21 +183,7 @@ class POSWindow(QWidget):
         
         # Product input section
         input_group = QGroupBox("Product Entry")
-        input_group.setStyleSheet("""
-            QGroupBox {
-                border: 2px solid #ccc;
-                border-radius: 0px;
-                margin-top: 10px;
-                padding-top: 15px;
-                background-color: white;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                left: 10px;
-                padding: 0 5px;
-                background-color: white;
-            }
-        """)
+        input_group.setStyleSheet(_GROUPBOX_CSS)
         input_layout = QVBoxLayout()
         
         product_layout = QHBoxLayout()
@@ -100,20 +215,7 @@ class POSWindow(QWidget):
         
         self.next_item_btn = QPushButton("Next Item")
         self.next_item_btn.clicked.connect(self.add_item_to_cart)
-        self.next_item_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #2196F3;
-                color: white;
-                border: 2px solid #1976D2;
-                font-weight: bold;
-                padding: 8px;
-                border-radius: 0px;
-            }
-            QPushButton:hover {
-                background-color: #4CAF50;
-                border: 2px solid #45a049;
-            }
-        """)
+        self.next_item_btn.setStyleSheet(_PRIMARY_BTN_CSS)
         quantity_layout.addWidget(self.next_item_btn)
         quantity_layout.addStretch()
         input_layout.addLayout(quantity_layout)
@@ -123,21 +225,7 @@ class POSWindow(QWidget):
         
         # Cart section
         cart_group = QGroupBox("Cart / Sale List")
-        cart_group.setStyleSheet("""
-            QGroupBox {
-                border: 2px solid #ccc;
-                border-radius: 0px;
-                margin-top: 10px;
-                padding-top: 15px;
-                background-color: white;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                left: 10px;
-                padding: 0 5px;
-                background-color: white;
-            }
-        """)
+        cart_group.setStyleSheet(_GROUPBOX_CSS)
         cart_layout = QVBoxLayout()
         
         self.cart_table = QTableWidget()
@@ -147,6 +235,7 @@ class POSWindow(QWidget):
         ])
         self.cart_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
         self.cart_table.horizontalHeader().setStretchLastSection(True)
+        self.cart_table.cellClicked.connect(self._on_cart_cell_clicked)
         cart_layout.addWidget(self.cart_table)
         
         # Cart total
@@ -165,62 +254,25 @@ class POSWindow(QWidget):
         
         self.remove_item_btn = QPushButton("Remove Selected Item")
         self.remove_item_btn.clicked.connect(self.remove_selected_item)
-        self.remove_item_btn.setStyleSheet("""
-            QPushButton {
-                background-color: white;
-                color: black;
-                border: 2px solid #000000;
-                padding: 8px 16px;
-                border-radius: 0px;
-            }
-            QPushButton:hover {
-                background-color: #f0f0f0;
-                border: 2px solid #000000;
-            }
-        """)
+        self.remove_item_btn.setStyleSheet(_SECONDARY_BTN_CSS)
         button_layout.addWidget(self.remove_item_btn)
         
         self.cancel_sale_btn = QPushButton("Cancel Sale")
         self.cancel_sale_btn.clicked.connect(self.cancel_sale)
-        self.cancel_sale_btn.setStyleSheet("""
-            QPushButton {
-                background-color: white;
-                color: black;
-                border: 2px solid #000000;
-                border-radius: 0px;
-            }
-            QPushButton:hover {
-                background-color: #f0f0f0;
-                border: 2px solid #000000;
-            }
-        """)
+        self.cancel_sale_btn.setStyleSheet(_SECONDARY_BTN_CSS)
         button_layout.addWidget(self.cancel_sale_btn)
         
         button_layout.addStretch()
         
         self.complete_sale_btn = QPushButton("Complete Sale")
         self.complete_sale_btn.clicked.connect(self.complete_sale)
-        self.complete_sale_btn.setStyleSheet("""
-            QPushButton {
-                background-color: white;
-                color: black;
-                border: 2px solid #000000;
-                font-weight: bold;
-                padding: 10px;
-                font-size: 14px;
-                border-radius: 0px;
-            }
-            QPushButton:hover {
-                background-color: #f0f0f0;
-                border: 2px solid #000000;
-            }
-        """)
+        self.complete_sale_btn.setStyleSheet(_COMPLETE_BTN_CSS)
         button_layout.addWidget(self.complete_sale_btn)
         
         main_layout.addLayout(button_layout)
         
         # Receipt buttons (for admin)
-        if is_admin():
+        if self._is_admin:
             receipt_layout = QHBoxLayout()
             receipt_layout.addStretch()
             self.reprint_btn = QPushButton("Reprint Last Receipt")
@@ -230,9 +282,18 @@ class POSWindow(QWidget):
         
         self.setLayout(main_layout)
         
+        # Keyboard shortcuts; F1 only exists for admins
+        self._key_handlers = {Qt.Key.Key_Escape: self.cancel_sale}
+        if self._is_admin:
+            self._key_handlers[Qt.Key.Key_F1] = self.show_admin_menu
+        
         # Auto-focus on product ID input
         QTimer.singleShot(100, self.product_id_input.setFocus)
     
+    def current_user(self) -> Optional[Dict]:
+        """Get the logged-in user captured when the window was created."""
+        return self._current_user
+    
     def on_product_id_entered(self):
         """Handle product ID entry (Enter key or barcode scan)."""
         product_id = self.product_id_input.text().strip()
@@ -260,6 +321,8 @@ class POSWindow(QWidget):
         self.product_price_label.setText(f"Price: {format_currency(product.selling_price)}")
         self.current_product_id = product_id
         self.current_quantity = quantity
+        self._pending_product = product
+        self._validated_token = (product_id, quantity, time.monotonic())
         
         # Auto-add to cart (optional - user can adjust quantity first)
         # For now, just show the product and let user click "Next Item"
@@ -270,53 +333,63 @@ class POSWindow(QWidget):
             show_error_dialog(self, "No Product", "Please enter a product ID first.")
             return
         
-        product = get_product(self.current_product_id)
+        product = self._pending_product or get_product(self.current_product_id)
         if not product:
             show_error_dialog(self, "Error", "Product not found.")
             return
         
         quantity = self.quantity_input.value()
         
-        # Validate stock
-        valid, msg = validate_stock_availability(self.current_product_id, quantity)
-        if not valid:
-            show_error_dialog(self, "Stock Error", msg)
-            return
+        # Validate stock, unless the scan just checked this exact quantity
+        token = self._validated_token
+        recently_validated = (token is not None and token[:2] == (self.current_product_id, quantity)
+                              and time.monotonic() - token[2] < self.VALIDATION_TTL)
+        if not recently_validated:
+            valid, msg = validate_stock_availability(self.current_product_id, quantity)
+            if not valid:
+                show_error_dialog(self, "Stock Error", msg)
+                return
         
         # Check if product already in cart
-        existing_item = None
-        for item in self.cart:
-            if item['product_id'] == self.current_product_id:
-                existing_item = item
-                break
+        existing_row = self._cart_index.get(self.current_product_id)
         
-        if existing_item:
+        if existing_row is not None:
+            existing_item = self.cart[existing_row]
             # Update quantity
             new_quantity = existing_item['quantity'] + quantity
             valid, msg = validate_stock_availability(self.current_product_id, new_quantity)
             if not valid:
                 show_error_dialog(self, "Stock Error", f"Cannot add {quantity} more. {msg}")
                 return
+            old_line_total = existing_item['line_total']
             existing_item['quantity'] = new_quantity
             existing_item['line_total'] = calculate_line_total(existing_item['unit_price'], existing_item['quantity'])
+            self._grand_total += existing_item['line_total'] - old_line_total
+            self._update_cart_row(existing_row)
         else:
             # Add new item
             line_total = calculate_line_total(product.selling_price, quantity)
-            self.cart.append({
+            item = {
                 'product_id': self.current_product_id,
                 'product_name': product.name,
                 'quantity': quantity,
                 'unit_price': product.selling_price,
                 'line_total': line_total
-            })
+            }
+            self._cart_index[item['product_id']] = len(self.cart)
+            self.cart.append(item)
+            self._grand_total += line_total
+            self._append_cart_row(item)
         
-        # Clear input and refresh
+        # Clear input and update the total
         self.product_id_input.clear()
         self.product_name_label.setText("Product: -")
         self.product_price_label.setText("Price: -")
         self.current_product_id = ""
+        self._pending_product = None
+        self._validated_token = None
         self.quantity_input.setValue(1)
-        self.refresh_cart()
+        self._update_cart_total()
         self.product_id_input.setFocus()
     
     def remove_selected_item(self):
@@ -326,10 +399,7 @@ class POSWindow(QWidget):
             show_error_dialog(self, "No Selection", "Please select an item to remove.")
             return
         
-        row = selected[0].row()
-        if 0 <= row < len(self.cart):
-            self.cart.pop(row)
-            self.refresh_cart()
+        self.remove_item_at_row(selected[0].row())
     
     def cancel_sale(self):
         """Cancel current sale and clear cart."""
@@ -348,61 +418,74 @@ class POSWindow(QWidget):
             show_error_dialog(self, "Empty Cart", "Cannot complete sale with empty cart.")
             return
         
-        # Validate all items have stock
-        for item in self.cart:
-            valid, msg = validate_stock_availability(item['product_id'], item['quantity'])
-            if not valid:
-                show_error_dialog(self, "Stock Error", f"{item['product_name']}: {msg}")
-                return
+        # Quick pre-check of the whole cart with one query; create_sale
+        # re-checks inside its transaction, which is what prevents overselling
+        valid, shortages = validate_stock_availability_bulk(self.cart)
+        if not valid:
+            product_id, available = shortages[0]
+            name = self.cart[self._cart_index[product_id]]['product_name']
+            show_error_dialog(self, "Stock Error", f"{name}: Insufficient stock. Available: {available}")
+            return
         
-        user = get_current_user()
+        user = self.current_user()
         if not user:
             show_error_dialog(self, "Error", "User session expired. Please login again.")
             return
         
-        # Create sale in database
-        sale_id = create_sale(
-            cashier_id=user['id'],
-            cashier_name=user['full_name'],
-            items=self.cart
-        )
-        
-        if not sale_id:
-            show_error_dialog(self, "Error", "Failed to create sale. Please try again.")
-            return
+        # Write the sale on a worker thread; the result arrives in _on_sale_committed
+        worker = SaleWorker(user['id'], user['full_name'], list(self.cart))
+        worker.signals.finished.connect(self._on_sale_committed)
+        self._pending_sales.add(worker.signals)
+        QThreadPool.globalInstance().start(worker)
         
         # Clear cart immediately for faster response
         self.cart.clear()
         self.refresh_cart()
         self.product_id_input.clear()
         self.product_id_input.setFocus()
+    
+    def _on_sale_committed(self, sale_id: Optional[int], items: List[Dict]):
+        """Report a finished sale and print its receipt."""
+        self._pending_sales.discard(self.sender())
+        
+        if not sale_id:
+            # Hand the items back so the cashier can retry, merged into any
+            # sale started in the meantime
+            self.restore_items(items)
+            show_error_dialog(self, "Error",
+                              "Failed to create sale (stock may have run out).\n\n"
+                              "Its items were returned to the cart. Please try again.")
+            return
         
-        # Show success message immediately
         show_info_dialog(self, "Sale Complete", f"Sale #{sale_id} completed successfully!")
         
         # Print receipt in background (non-blocking)
         try:
             from app.models import get_sale_details
-            from app.settings import load_settings
             
             sale_data = get_sale_details(sale_id)
             if sale_data:
-                settings = load_settings()
-                printer_type = settings.get("printer", {}).get("type", "file")
-                # Print in a background thread to avoid blocking the UI
-                import threading
-
-                def _print_async(data, ptype):
-                    try:
-                        print_receipt(data, printer_type=ptype)
-                    except Exception as _e:
-                        print(f"Receipt printing error (background): {_e}")
-
-                threading.Thread(target=_print_async, args=(sale_data, printer_type), daemon=True).start()
+                printer_type = self._settings.get("printer", {}).get("type", "file")
+                # Print on the printer thread to avoid blocking the UI
+                self._print_queue.put((sale_data, printer_type))
         except Exception as e:
             # Don't block on receipt printing errors
             print(f"Receipt printing error: {e}")
     
+    def restore_items(self, items: List[Dict]):
+        """Put items back into the cart, adding to the quantity of products already in it."""
+        for item in items:
+            row = self._cart_index.get(item['product_id'])
+            if row is None:
+                self._cart_index[item['product_id']] = len(self.cart)
+                self.cart.append(dict(item))
+            else:
+                existing_item = self.cart[row]
+                existing_item['quantity'] += item['quantity']
+                existing_item['line_total'] = calculate_line_total(existing_item['unit_price'],
+                                                                   existing_item['quantity'])
+        self.refresh_cart()
+    
     def reprint_receipt(self):
         """Reprint last receipt (Admin only)."""
         success, msg = reprint_last_receipt()
@@ -412,44 +495,71 @@ class POSWindow(QWidget):
             show_error_dialog(self, "Reprint Failed", msg)
     
     def refresh_cart(self):
-        """Refresh cart table display."""
-        self.cart_table.setRowCount(len(self.cart))
-        
-        for row_idx, item in enumerate(self.cart):
-            self.cart_table.setItem(row_idx, 0, QTableWidgetItem(item['product_name']))
-            self.cart_table.setItem(row_idx, 1, QTableWidgetItem(str(item['quantity'])))
-            self.cart_table.setItem(row_idx, 2, QTableWidgetItem(format_currency(item['unit_price'])))
-            self.cart_table.setItem(row_idx, 3, QTableWidgetItem(format_currency(item['line_total'])))
-            
-            # Remove button
-            remove_btn = QPushButton("Remove")
-            remove_btn.setStyleSheet("""
-                QPushButton {
-                    background-color: white;
-                    color: black;
-                    border: 2px solid #000000;
-                    padding: 5px 10px;
-                    border-radius: 0px;
-                }
-                QPushButton:hover {
-                    background-color: #f0f0f0;
-                    border: 2px solid #000000;
-                }
-            """)
-            remove_btn.clicked.connect(lambda checked, r=row_idx: self.remove_item_at_row(r))
-            self.cart_table.setCellWidget(row_idx, 4, remove_btn)
-        
-        # Update total
-        grand_total = calculate_grand_total(self.cart)
-        self.total_label.setText(f"Grand Total: {format_currency(grand_total)}")
+        """Rebuild the whole cart table display."""
+        self._cart_index = {item['product_id']: row_idx for row_idx, item in enumerate(self.cart)}
+        
+        # Repaint once for the whole rebuild rather than once per cell
+        self.cart_table.setUpdatesEnabled(False)
+        self.cart_table.blockSignals(True)
+        try:
+            self.cart_table.setRowCount(0)
+            for item in self.cart:
+                self._append_cart_row(item)
+        finally:
+            self.cart_table.blockSignals(False)
+            self.cart_table.setUpdatesEnabled(True)
+            self.cart_table.viewport().update()
+        self._grand_total = calculate_grand_total(self.cart)
+        self._update_cart_total()
+    
+    def _append_cart_row(self, item: Dict):
+        """Add a table row for a new cart item."""
+        row_idx = self.cart_table.rowCount()
+        self.cart_table.insertRow(row_idx)
+        self.cart_table.setItem(row_idx, 0, QTableWidgetItem(item['product_name']))
+        self.cart_table.setItem(row_idx, 1, QTableWidgetItem(str(item['quantity'])))
+        self.cart_table.setItem(row_idx, 2, QTableWidgetItem(format_currency(item['unit_price'])))
+        self.cart_table.setItem(row_idx, 3, QTableWidgetItem(format_currency(item['line_total'])))
+        
+        # Plain item acting as the remove control; clicks arrive via cellClicked
+        remove_item = QTableWidgetItem("× Remove")
+        remove_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.cart_table.setItem(row_idx, 4, remove_item)
+    
+    def _update_cart_row(self, row: int):
+        """Refresh the quantity and line total cells of one cart row."""
+        item = self.cart[row]
+        self.cart_table.item(row, 1).setText(str(item['quantity']))
+        self.cart_table.item(row, 3).setText(format_currency(item['line_total']))
+    
+    def _update_cart_total(self):
+        """Update the grand total label and resize columns once per burst."""
+        self.total_label.setText(f"Grand Total: {format_currency(self._grand_total)}")
         
+        if not self._resize_pending:
+            self._resize_pending = True
+            QTimer.singleShot(0, self._resize_cart_columns)
+    
+    def _resize_cart_columns(self):
+        self._resize_pending = False
         self.cart_table.resizeColumnsToContents()
     
+    def _on_cart_cell_clicked(self, row: int, column: int):
+        """Remove the row when its Action cell is clicked."""
+        if column == 4:
+            self.remove_item_at_row(row)
+    
     def remove_item_at_row(self, row: int):
         """Remove item at specific row."""
         if 0 <= row < len(self.cart):
-            self.cart.pop(row)
-            self.refresh_cart()
+            removed = self.cart.pop(row)
+            self._grand_total -= removed['line_total']
+            del self._cart_index[removed['product_id']]
+            # Rows below the removed one move up by one
+            for item in self.cart[row:]:
+                self._cart_index[item['product_id']] -= 1
+            self.cart_table.removeRow(row)
+            self._update_cart_total()
     
     def show_admin_menu(self):
         """Show admin menu with all admin options."""
@@ -467,47 +577,51 @@ class POSWindow(QWidget):
         action = menu.exec(self.admin_menu_btn.mapToGlobal(self.admin_menu_btn.rect().bottomLeft()))
         
         if action == inventory_action:
-            from app.inventory import InventoryWindow
+            from app._lazy import InventoryWindow
             self.inventory_window = InventoryWindow()
             self.inventory_window.setWindowModality(Qt.WindowModality.WindowModal)
             self.inventory_window.show()
         elif action == reports_action:
-            from app.reports import ReportsWindow
+            from app._lazy import ReportsWindow
             self.reports_window = ReportsWindow()
             self.reports_window.setWindowModality(Qt.WindowModality.WindowModal)
             self.reports_window.show()
         elif action == users_action:
-            from app.users import UsersWindow
+            from app._lazy import UsersWindow
             self.users_window = UsersWindow()
             self.users_window.setWindowModality(Qt.WindowModality.WindowModal)
             self.users_window.show()
         elif action == settings_action:
-            from app.settings import SettingsWindow
+            from app._lazy import SettingsWindow
             self.settings_window = SettingsWindow()
+            self.settings_window.settingsChanged.connect(self._reload_settings)
             self.settings_window.setWindowModality(Qt.WindowModality.WindowModal)
             self.settings_window.show()
         elif action == backup_action:
-            from app.backup import BackupWindow
+            from app._lazy import BackupWindow
             self.backup_window = BackupWindow()
             self.backup_window.setWindowModality(Qt.WindowModality.WindowModal)
             self.backup_window.show()
         elif action == password_action:
-            from app.password import PasswordChangeDialog
+            from app._lazy import PasswordChangeDialog
             dialog = PasswordChangeDialog(self)
             dialog.exec()
     
+    def _reload_settings(self, settings: Dict):
+        """Pick up settings saved from the settings window."""
+        self._settings = settings
+    
     def change_password(self):
         """Show password change dialog."""
-        from app.password import PasswordChangeDialog
+        from app._lazy import PasswordChangeDialog
         dialog = PasswordChangeDialog(self)
         dialog.exec()
     
     def keyPressEvent(self, event: QKeyEvent):
         """Handle keyboard shortcuts."""
-        if event.key() == Qt.Key.Key_Escape:
-            self.cancel_sale()
-        elif event.key() == Qt.Key.Key_F1 and is_admin():
-            self.show_admin_menu()
+        handler = self._key_handlers.get(event.key())
+        if handler:
+            handler()
         else:
             super().keyPressEvent(event)
 
@@ -2,10 +2,13 @@
 Receipt printing module for Alcohol POS System.
 Handles ESC/POS printer communication and receipt formatting.
 """
+import os
 from datetime import datetime
+from functools import lru_cache
 from typing import List, Dict, Optional
 from app.config import SHOP_NAME, SHOP_DISPLAY_NAME, SHOP_LOCATION, SHOP_CONTACT, RECEIPT_ALCOHOL_WARNING
 from app.utils import format_currency, format_datetime
+from app.settings_store import get_cached_settings
 
 try:
     from escpos.printer import Usb, Serial, File
@@ -16,6 +19,37 @@ except ImportError:
 
 _last_receipt_data: Optional[Dict] = None
 
+# Rendered receipt text for recent sales; a sale never changes once
+# written, so (sale_id, sale_date) identifies its receipt
+_RECEIPT_CACHE_SIZE = 64
+_receipt_cache: Dict[tuple, str] = {}
+
+# O_BINARY only exists (and matters) on Windows
+_RECEIPT_FILE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+
+# Shop header and closing lines depend only on config, so they are
+# joined once here instead of on every receipt
+_RECEIPT_HEADER = "\n".join([
+    "=" * 50,
+    f"  {SHOP_DISPLAY_NAME}",
+    f"  Location: {SHOP_LOCATION}",
+    f"  Contact: {SHOP_CONTACT}",
+    "=" * 50,
+])
+_RECEIPT_FOOTER = "\n".join([
+    "=" * 40,
+    "",
+    RECEIPT_ALCOHOL_WARNING,
+    "",
+    "Thank you for your purchase!",
+    "=" * 40,
+])
+
+# Item table layout; the column header row never changes
+_RECEIPT_ROW = "{:<20} {:>6} {:>5} {:>10} {:>10}".format
+_RECEIPT_COLUMNS = _RECEIPT_ROW("Item", "MLs", "Qty", "Price", "Total")
+_RECEIPT_TOTAL = "{:<30} {:>10}".format
+
 def format_receipt_text(sale_data: Dict) -> str:
     """
     Format receipt as text string.
@@ -26,57 +60,58 @@ def format_receipt_text(sale_data: Dict) -> str:
     Returns:
         Formatted receipt text
     """
-    lines = []
-    lines.append("=" * 50)
-    lines.append(f"  {SHOP_DISPLAY_NAME}")
-    lines.append(f"  Location: {SHOP_LOCATION}")
-    lines.append(f"  Contact: {SHOP_CONTACT}")
-    lines.append("=" * 50)
-    # Parse sale_date (handle both string and datetime)
-    sale_date_str = sale_data['sale_date']
-    if isinstance(sale_date_str, str):
+    lines = [_RECEIPT_HEADER]
+    # Parse sale_date (handle both string and datetime); SQLite's
+    # 'YYYY-MM-DD HH:MM:SS' and ISO 8601 both go through fromisoformat
+    sale_dt = sale_data['sale_date']
+    if isinstance(sale_dt, str):
+        if sale_dt.endswith('Z'):
+            sale_dt = sale_dt[:-1] + '+00:00'
         try:
-            # Try parsing ISO format
-            if 'T' in sale_date_str:
-                sale_dt = datetime.fromisoformat(sale_date_str.replace('Z', '+00:00'))
-            else:
-                sale_dt = datetime.strptime(sale_date_str, "%Y-%m-%d %H:%M:%S")
-        except:
+            sale_dt = datetime.fromisoformat(sale_dt)
+        except ValueError:
             sale_dt = datetime.now()
-    else:
-        sale_dt = sale_date_str if isinstance(sale_date_str, datetime) else datetime.now()
+    elif not isinstance(sale_dt, datetime):
+        sale_dt = datetime.now()
     
     lines.append(f"Date: {format_datetime(sale_dt)}")
     lines.append(f"Cashier: {sale_data['cashier_name']}")
     lines.append(f"Receipt #: {sale_data['sale_id']}")
     lines.append("-" * 50)
-    lines.append(f"{'Item':<20} {'MLs':>6} {'Qty':>5} {'Price':>10} {'Total':>10}")
+    lines.append(_RECEIPT_COLUMNS)
     lines.append("-" * 50)
     
     for item in sale_data['items']:
         name = item['product_name'][:20]  # Truncate long names
-        # Handle milliliters - may not exist in older databases
-        try:
-            mls = item['milliliters'] if item.get('milliliters') is not None else 0
-        except (KeyError, TypeError):
-            mls = 0
+        mls = item.get('milliliters') or 0
         mls_str = f"{mls}ml" if mls > 0 else "-"
         qty = item['quantity']
         price = format_currency(item['unit_price'])
         total = format_currency(item['line_total'])
-        lines.append(f"{name:<20} {mls_str:>6} {qty:>5} {price:>10} {total:>10}")
+        lines.append(_RECEIPT_ROW(name, mls_str, qty, price, total))
     
     lines.append("-" * 40)
-    lines.append(f"{'GRAND TOTAL:':<30} {format_currency(sale_data['grand_total']):>10}")
-    lines.append("=" * 40)
-    lines.append("")
-    lines.append(RECEIPT_ALCOHOL_WARNING)
-    lines.append("")
-    lines.append("Thank you for your purchase!")
-    lines.append("=" * 40)
+    lines.append(_RECEIPT_TOTAL("GRAND TOTAL:", format_currency(sale_data['grand_total'])))
+    lines.append(_RECEIPT_FOOTER)
     
     return "\n".join(lines)
 
+@lru_cache(maxsize=16)
+def _parse_usb_id(value: str) -> int:
+    """Parse a USB vendor/product ID given in decimal or 0x-prefixed hex."""
+    return int(value, 16) if value.startswith('0x') else int(value)
+
+def render_receipt(sale_data: Dict) -> str:
+    """Get receipt text for a sale, formatting it only the first time."""
+    key = (sale_data['sale_id'], str(sale_data['sale_date']))
+    text = _receipt_cache.get(key)
+    if text is None:
+        text = format_receipt_text(sale_data)
+        if len(_receipt_cache) >= _RECEIPT_CACHE_SIZE:
+            _receipt_cache.pop(next(iter(_receipt_cache)), None)
+        _receipt_cache[key] = text
+    return text
+
 def print_receipt(sale_data: Dict, printer_type: str = None) -> tuple[bool, str]:
     """
     Print receipt to printer.
@@ -92,43 +127,37 @@ def print_receipt(sale_data: Dict, printer_type: str = None) -> tuple[bool, str]
     _last_receipt_data = sale_data
     
     # Load printer type from settings if not provided
+    settings = get_cached_settings()
     if printer_type is None:
-        from app.settings import load_settings
-        settings = load_settings()
         printer_type = settings.get("printer", {}).get("type", "file")
     
-    if not ESCPOS_AVAILABLE:
-        # Fallback to file printing
-        return print_to_file(sale_data)
-    
     try:
-        receipt_text = format_receipt_text(sale_data)
+        # Rendered once and handed to whichever output ends up being used
+        receipt_text = render_receipt(sale_data)
+        
+        if not ESCPOS_AVAILABLE:
+            # Fallback to file printing
+            return print_to_file(sale_data, receipt_text)
         
         if printer_type == "file":
-            return print_to_file(sale_data)
+            return print_to_file(sale_data, receipt_text)
         elif printer_type == "usb":
             # Try USB printer
-            from app.settings import load_settings
-            settings = load_settings()
             vendor_id = settings.get("printer", {}).get("usb_vendor_id", "")
             product_id = settings.get("printer", {}).get("usb_product_id", "")
             
             if vendor_id and product_id:
                 try:
-                    vendor_id_int = int(vendor_id, 16) if vendor_id.startswith('0x') else int(vendor_id)
-                    product_id_int = int(product_id, 16) if product_id.startswith('0x') else int(product_id)
-                    printer = Usb(vendor_id_int, product_id_int)
+                    printer = Usb(_parse_usb_id(vendor_id), _parse_usb_id(product_id))
                     printer.text(receipt_text)
                     printer.cut()
                     return True, "Receipt printed to USB printer"
                 except Exception as e:
-                    return print_to_file(sale_data)  # Fallback to file
+                    return print_to_file(sale_data, receipt_text)  # Fallback to file
             else:
-                return print_to_file(sale_data)  # Fallback to file
+                return print_to_file(sale_data, receipt_text)  # Fallback to file
         elif printer_type == "serial":
             # Try serial printer
-            from app.settings import load_settings
-            settings = load_settings()
             port = settings.get("printer", {}).get("serial_port", "COM1")
             baudrate = settings.get("printer", {}).get("baudrate", 9600)
             
@@ -138,28 +167,34 @@ def print_receipt(sale_data: Dict, printer_type: str = None) -> tuple[bool, str]
                 printer.cut()
                 return True, f"Receipt printed to serial printer ({port})"
             except Exception as e:
-                return print_to_file(sale_data)  # Fallback to file
+                return print_to_file(sale_data, receipt_text)  # Fallback to file
         else:
-            return print_to_file(sale_data)
+            return print_to_file(sale_data, receipt_text)
             
     except Exception as e:
         return False, f"Print error: {str(e)}"
 
-def print_to_file(sale_data: Dict) -> tuple[bool, str]:
-    """Print receipt to file (fallback method)."""
+def print_to_file(sale_data: Dict, receipt_text: Optional[str] = None) -> tuple[bool, str]:
+    """Print receipt to file (fallback method), reusing receipt_text if already rendered."""
     try:
         from app.config import BASE_DIR
         from pathlib import Path
         
-        receipt_text = format_receipt_text(sale_data)
+        if receipt_text is None:
+            receipt_text = render_receipt(sale_data)
         receipt_dir = BASE_DIR / "receipts"
         receipt_dir.mkdir(exist_ok=True)
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         receipt_file = receipt_dir / f"receipt_{sale_data['sale_id']}_{timestamp}.txt"
         
-        with open(receipt_file, 'w', encoding='utf-8') as f:
-            f.write(receipt_text)
+        # One raw write; line endings are translated here, as text mode would
+        receipt_bytes = receipt_text.replace("\n", os.linesep).encode('utf-8')
+        fd = os.open(receipt_file, _RECEIPT_FILE_FLAGS, 0o644)
+        try:
+            os.write(fd, receipt_bytes)
+        finally:
+            os.close(fd)
         
         return True, f"Receipt saved to: {receipt_file}"
     except Exception as e:
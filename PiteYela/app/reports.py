@@ -2,17 +2,128 @@
 Reports and financial analysis module for Alcohol POS System.
 Admin-only sales reports, profit/loss analysis, and exports.
 """
+import hashlib
+import shutil
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableWidget,
                              QTableWidgetItem, QPushButton, QLabel, QDateEdit,
                              QComboBox, QGroupBox, QFormLayout, QMessageBox, QFileDialog)
 from PyQt6.QtCore import QDate, Qt
+from app.config import BASE_DIR
 from app.database import get_connection
 from app.auth import is_admin
-from app.utils import format_currency, format_date, get_date_range, show_error_dialog, show_info_dialog
+from app.utils import format_currency, format_currency_many, format_date, get_date_range, show_error_dialog, show_info_dialog
 from datetime import datetime
 
+# Previously rendered PDF reports, named by a hash of their contents;
+# only the most recently used few are kept
+PDF_CACHE_DIR = BASE_DIR / "reports" / "cache"
+PDF_CACHE_MAX_FILES = 5
+
+def _cache_pdf(filename: str, cached_pdf: Path) -> None:
+    """Copy a freshly built report into the cache and evict the oldest copies."""
+    PDF_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(filename, cached_pdf)
+    cached = sorted(PDF_CACHE_DIR.glob("*.pdf"), key=lambda path: path.stat().st_mtime, reverse=True)
+    for old_pdf in cached[PDF_CACHE_MAX_FILES:]:
+        old_pdf.unlink(missing_ok=True)
+
+# Rows sampled when sizing report columns to their contents
+RESIZE_SAMPLE_ROWS = 200
+
+# Report statements; the sales and item queries take half-open
+# (start, end) date bounds
+_COST_MAP_SQL = "SELECT id, cost_price FROM products"
+
+_REPORT_SALES_SQL = """
+    SELECT id, sale_date, cashier_name, grand_total
+    FROM sales
+    WHERE sale_date >= ? AND sale_date < ?
+    ORDER BY sale_date DESC
+"""
+
+_REPORT_ITEMS_SQL = """
+    SELECT si.sale_id, si.product_id, si.quantity, si.line_total
+    FROM sale_items si
+    JOIN sales s ON s.id = si.sale_id
+    WHERE s.sale_date >= ? AND s.sale_date < ?
+"""
+
+# Starting column widths; refilling a table keeps them instead of
+# measuring every cell, and "Fit Columns" sizes them to the contents
+SALES_COLUMN_WIDTHS = (80, 150, 150, 60, 110, 110)
+CASHIER_COLUMN_WIDTHS = (180, 110, 130)
+
+@contextmanager
+def bulk_table_update(table: QTableWidget):
+    """Suspend repaints, sorting and signals while a table is refilled."""
+    sorting = table.isSortingEnabled()
+    table.setUpdatesEnabled(False)
+    table.setSortingEnabled(False)
+    table.blockSignals(True)
+    try:
+        yield
+    finally:
+        table.blockSignals(False)
+        table.setSortingEnabled(sorting)
+        table.setUpdatesEnabled(True)
+
+def fill_table(table: QTableWidget, rows) -> None:
+    """
+    Replace a table's contents with rows of display strings.
+    
+    Items left over from the previous fill are updated in place, so
+    regenerating a report only allocates items for rows it didn't have.
+    """
+    with bulk_table_update(table):
+        table.setRowCount(len(rows))
+        for row_idx, row in enumerate(rows):
+            for col, text in enumerate(row):
+                item = table.item(row_idx, col)
+                if item is None:
+                    table.setItem(row_idx, col, QTableWidgetItem(text))
+                else:
+                    item.setText(text)
+
+@lru_cache(maxsize=1)
+def _pdf_styles():
+    """
+    Build the reportlab stylesheet and table styles on first PDF export.
+    
+    They never change, so later exports reuse them; reportlab is still
+    only imported once a PDF is actually requested.
+    """
+    from reportlab.platypus import TableStyle
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib import colors
+    
+    summary_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+    sales_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('FONTSIZE', (0, 1), (-1, -1), 8),
+    ])
+    return getSampleStyleSheet(), summary_style, sales_style
+
 class ReportsWindow(QWidget):
     """Reports and financial analysis window (Admin only)."""
     
@@ -22,6 +133,10 @@ class ReportsWindow(QWidget):
             show_error_dialog(self, "Access Denied", "Admin access required")
             return
         
+        # Formatted rows and summary of the last generated report, for exports
+        self._last_report_rows: List[Tuple[str, ...]] = []
+        self._last_summary: List[Tuple[str, str]] = []
+        
         self.setWindowTitle("PiteYelaHouseofWine_POS - Sales Reports & Financial Analysis")
         self.resize(1200, 700)
         self.setStyleSheet("background-color: white;")
@@ -35,6 +150,9 @@ class ReportsWindow(QWidget):
         self.back_btn.clicked.connect(self.close)
         back_layout.addWidget(self.back_btn)
         back_layout.addStretch()
+        self.fit_columns_btn = QPushButton("Fit Columns")
+        self.fit_columns_btn.clicked.connect(self.fit_columns)
+        back_layout.addWidget(self.fit_columns_btn)
         layout.addLayout(back_layout)
         
         # Filter section
@@ -159,6 +277,9 @@ class ReportsWindow(QWidget):
                 color: white;
             }
         """)
+        self.table.horizontalHeader().setResizeContentsPrecision(RESIZE_SAMPLE_ROWS)
+        for col, width in enumerate(SALES_COLUMN_WIDTHS):
+            self.table.setColumnWidth(col, width)
         layout.addWidget(self.table)
         
         # Cashier summary table
@@ -198,6 +319,9 @@ class ReportsWindow(QWidget):
                 color: white;
             }
         """)
+        self.cashier_table.horizontalHeader().setResizeContentsPrecision(RESIZE_SAMPLE_ROWS)
+        for col, width in enumerate(CASHIER_COLUMN_WIDTHS):
+            self.cashier_table.setColumnWidth(col, width)
         cashier_layout.addWidget(self.cashier_table)
         
         cashier_group.setLayout(cashier_layout)
@@ -208,6 +332,11 @@ class ReportsWindow(QWidget):
         # Generate initial report
         self.generate_report()
     
+    def fit_columns(self):
+        """Size both report tables' columns to their current contents."""
+        self.table.resizeColumnsToContents()
+        self.cashier_table.resizeColumnsToContents()
+    
     def on_period_changed(self, period: str):
         """Update date fields based on period selection."""
         today = QDate.currentDate()
@@ -241,98 +370,88 @@ class ReportsWindow(QWidget):
     def generate_report(self):
         """Generate sales report based on selected filters."""
         start_dt, end_dt = self.get_date_range_from_ui()
+        # Half-open range on the raw column so the sale_date index can be used
+        date_bounds = (start_dt.strftime('%Y-%m-%d'),
+                       (end_dt.date() + timedelta(days=1)).strftime('%Y-%m-%d'))
         
         conn = get_connection()
         try:
-            # Get sales in date range
+            # Plain tuples instead of sqlite3.Row; the loops below unpack
+            # columns by position rather than looking them up by name
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT s.id, s.sale_date, s.cashier_name, s.grand_total,
-                       COUNT(si.id) as item_count
-                FROM sales s
-                LEFT JOIN sale_items si ON s.id = si.sale_id
-                WHERE DATE(s.sale_date) BETWEEN DATE(?) AND DATE(?)
-                GROUP BY s.id
-                ORDER BY s.sale_date DESC
-            """, (start_dt.isoformat(), end_dt.isoformat()))
-            
-            sales = cursor.fetchall()
-            
-            # Calculate profit for each sale
-            total_sales = 0.0
-            total_cost = 0.0
-            total_profit = 0.0
-            
-            self.table.setRowCount(len(sales))
-            for row_idx, sale in enumerate(sales):
-                sale_id = sale['id']
-                
-                # Get sale items to calculate profit
-                cursor.execute("""
-                    SELECT si.product_id, si.quantity, si.unit_price, si.line_total,
-                           p.cost_price
-                    FROM sale_items si
-                    JOIN products p ON si.product_id = p.id
-                    WHERE si.sale_id = ?
-                """, (sale_id,))
-                
-                items = cursor.fetchall()
-                sale_profit = 0.0
-                for item in items:
-                    cost = item['cost_price'] * item['quantity']
-                    sale_profit += item['line_total'] - cost
-                
-                total_sales += sale['grand_total']
-                total_cost += sum(item['cost_price'] * item['quantity'] for item in items)
-                total_profit += sale_profit
-                
-                # Populate table
-                self.table.setItem(row_idx, 0, QTableWidgetItem(str(sale['id'])))
-                self.table.setItem(row_idx, 1, QTableWidgetItem(sale['sale_date']))
-                self.table.setItem(row_idx, 2, QTableWidgetItem(sale['cashier_name']))
-                self.table.setItem(row_idx, 3, QTableWidgetItem(str(sale['item_count'])))
-                self.table.setItem(row_idx, 4, QTableWidgetItem(format_currency(sale['grand_total'])))
-                self.table.setItem(row_idx, 5, QTableWidgetItem(format_currency(sale_profit)))
-            
-            self.table.resizeColumnsToContents()
+            cursor.row_factory = None
+            
+            # Cost prices for every product, looked up per item in Python
+            # instead of joining products against each sale item
+            cost_map = dict(cursor.execute(_COST_MAP_SQL))
+            
+            # Get sales in date range
+            sales = cursor.execute(_REPORT_SALES_SQL, date_bounds).fetchall()
+            
+            # Item count, cost and profit per sale; items whose product no
+            # longer exists are counted but add to neither cost nor profit
+            item_counts: Dict[int, int] = {}
+            sale_costs: Dict[int, int] = {}
+            costed_revenue: Dict[int, int] = {}
+            for sale_id, product_id, quantity, line_total in cursor.execute(_REPORT_ITEMS_SQL, date_bounds):
+                item_counts[sale_id] = item_counts.get(sale_id, 0) + 1
+                cost_price = cost_map.get(product_id)
+                if cost_price is not None:
+                    sale_costs[sale_id] = sale_costs.get(sale_id, 0) + cost_price * quantity
+                    costed_revenue[sale_id] = costed_revenue.get(sale_id, 0) + line_total
+            
+            grand_totals = [grand_total for _, _, _, grand_total in sales]
+            sale_profits = [costed_revenue.get(sale_id, 0) - sale_costs.get(sale_id, 0)
+                            for sale_id, _, _, _ in sales]
+            total_sales = sum(grand_totals)
+            total_cost = sum(sale_costs.values())
+            total_profit = sum(sale_profits)
+            
+            # Format the money columns in bulk; the rows are kept for exports
+            totals = format_currency_many(grand_totals)
+            profits = format_currency_many(sale_profits)
+            report_rows = [
+                (str(sale_id), sale_date, cashier_name, str(item_counts.get(sale_id, 0)), total, profit)
+                for (sale_id, sale_date, cashier_name, _), total, profit in zip(sales, totals, profits)
+            ]
+            
+            # Populate table
+            fill_table(self.table, report_rows)
+            self._last_report_rows = report_rows
             
             # Update summary
-            self.total_sales_label.setText(f"Total Sales: {format_currency(total_sales)}")
-            self.total_transactions_label.setText(f"Transactions: {len(sales)}")
-            self.total_cost_label.setText(f"Total Cost: {format_currency(total_cost)}")
-            self.total_profit_label.setText(f"Total Profit: {format_currency(total_profit)}")
+            self._last_summary = [
+                ('Total Sales', format_currency(total_sales)),
+                ('Total Transactions', str(len(sales))),
+                ('Total Cost', format_currency(total_cost)),
+                ('Total Profit', format_currency(total_profit)),
+            ]
+            self.total_sales_label.setText(f"Total Sales: {self._last_summary[0][1]}")
+            self.total_transactions_label.setText(f"Transactions: {self._last_summary[1][1]}")
+            self.total_cost_label.setText(f"Total Cost: {self._last_summary[2][1]}")
+            self.total_profit_label.setText(f"Total Profit: {self._last_summary[3][1]}")
             
             # Cashier summary
-            cursor.execute("""
+            cashiers = cursor.execute("""
                 SELECT cashier_name, COUNT(*) as transaction_count, SUM(grand_total) as total_sales
                 FROM sales
-                WHERE DATE(sale_date) BETWEEN DATE(?) AND DATE(?)
+                WHERE sale_date >= ? AND sale_date < ?
                 GROUP BY cashier_name
                 ORDER BY total_sales DESC
-            """, (start_dt.isoformat(), end_dt.isoformat()))
-            
-            cashiers = cursor.fetchall()
-            self.cashier_table.setRowCount(len(cashiers))
-            
-            for row_idx, cashier in enumerate(cashiers):
-                self.cashier_table.setItem(row_idx, 0, QTableWidgetItem(cashier['cashier_name']))
-                self.cashier_table.setItem(row_idx, 1, QTableWidgetItem(str(cashier['transaction_count'])))
-                self.cashier_table.setItem(row_idx, 2, QTableWidgetItem(format_currency(cashier['total_sales'] or 0)))
-            
-            self.cashier_table.resizeColumnsToContents()
+            """, date_bounds).fetchall()
+            fill_table(self.cashier_table, [
+                (cashier_name, str(transaction_count), format_currency(cashier_sales or 0))
+                for cashier_name, transaction_count, cashier_sales in cashiers
+            ])
             
         except Exception as e:
             show_error_dialog(self, "Error", f"Failed to generate report: {str(e)}")
-        finally:
-            conn.close()
     
     def export_to_pdf(self):
         """Export current report to PDF."""
         try:
             from reportlab.lib.pagesizes import letter
-            from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-            from reportlab.lib.styles import getSampleStyleSheet
-            from reportlab.lib import colors
+            from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer
             from app.config import SHOP_NAME, SHOP_LOCATION, SHOP_CONTACT
             
             filename, _ = QFileDialog.getSaveFileName(
@@ -345,9 +464,24 @@ class ReportsWindow(QWidget):
             if not filename.endswith('.pdf'):
                 filename += '.pdf'
             
+            start_dt, end_dt = self.get_date_range_from_ui()
+            date_text = f"Period: {start_dt.strftime('%Y-%m-%d')} to {end_dt.strftime('%Y-%m-%d')}"
+            
+            # A report with identical contents is copied from the cache
+            # before any flowables are built
+            cache_key = hashlib.sha1(repr((SHOP_NAME, SHOP_LOCATION, SHOP_CONTACT, date_text,
+                                           self._last_summary, self._last_report_rows)
+                                          ).encode('utf-8')).hexdigest()
+            cached_pdf = PDF_CACHE_DIR / f"{cache_key}.pdf"
+            if cached_pdf.exists():
+                shutil.copyfile(cached_pdf, filename)
+                cached_pdf.touch()  # Mark as recently used so eviction keeps it
+                show_info_dialog(self, "Success", f"Report exported to PDF:\n{filename}")
+                return
+            
             doc = SimpleDocTemplate(filename, pagesize=letter)
             elements = []
-            styles = getSampleStyleSheet()
+            styles, summary_style, sales_style = _pdf_styles()
             
             # Title and shop info
             title = Paragraph(f"<b>{SHOP_NAME} - Sales Report</b>", styles['Title'])
@@ -357,59 +491,25 @@ class ReportsWindow(QWidget):
             elements.append(Spacer(1, 12))
             
             # Date range
-            start_dt, end_dt = self.get_date_range_from_ui()
-            date_text = f"Period: {start_dt.strftime('%Y-%m-%d')} to {end_dt.strftime('%Y-%m-%d')}"
             elements.append(Paragraph(date_text, styles['Normal']))
             elements.append(Spacer(1, 12))
             
             # Summary
-            summary_data = [
-                ['Metric', 'Value'],
-                ['Total Sales', self.total_sales_label.text().split(': ')[1]],
-                ['Total Transactions', self.total_transactions_label.text().split(': ')[1]],
-                ['Total Cost', self.total_cost_label.text().split(': ')[1]],
-                ['Total Profit', self.total_profit_label.text().split(': ')[1]],
-            ]
-            summary_table = Table(summary_data)
-            summary_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
+            summary_table = Table([('Metric', 'Value')] + self._last_summary)
+            summary_table.setStyle(summary_style)
             elements.append(summary_table)
             elements.append(Spacer(1, 20))
             
             # Sales table
-            if self.table.rowCount() > 0:
-                sales_data = [['Sale ID', 'Date', 'Cashier', 'Items', 'Total', 'Profit']]
-                for row in range(self.table.rowCount()):
-                    row_data = []
-                    for col in range(self.table.columnCount()):
-                        item = self.table.item(row, col)
-                        row_data.append(item.text() if item else '')
-                    sales_data.append(row_data)
-                
-                sales_table = Table(sales_data)
-                sales_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 10),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                    ('FONTSIZE', (0, 1), (-1, -1), 8),
-                ]))
+            if self._last_report_rows:
+                sales_table = Table([('Sale ID', 'Date', 'Cashier', 'Items', 'Total', 'Profit')]
+                                    + self._last_report_rows)
+                sales_table.setStyle(sales_style)
                 elements.append(Paragraph("<b>Sales Details</b>", styles['Heading2']))
                 elements.append(sales_table)
             
             doc.build(elements)
+            _cache_pdf(filename, cached_pdf)
             show_info_dialog(self, "Success", f"Report exported to PDF:\n{filename}")
         except ImportError:
             show_error_dialog(self, "Error", "reportlab package not installed")
@@ -420,7 +520,9 @@ class ReportsWindow(QWidget):
         """Export current report to Excel."""
         try:
             from openpyxl import Workbook
-            from openpyxl.styles import Font, PatternFill, Alignment
+            from openpyxl.cell import WriteOnlyCell
+            from openpyxl.styles import Font, PatternFill
+            from openpyxl.utils import get_column_letter
             
             filename, _ = QFileDialog.getSaveFileName(
                 self, "Export to Excel", "", "Excel Files (*.xlsx)"
@@ -432,76 +534,64 @@ class ReportsWindow(QWidget):
             if not filename.endswith('.xlsx'):
                 filename += '.xlsx'
             
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Sales Report"
+            # Write-only mode streams rows to disk instead of keeping a cell
+            # object per value; rows are appended in order
+            wb = Workbook(write_only=True)
+            ws = wb.create_sheet("Sales Report")
+            
+            def styled(value, font, fill=None):
+                cell = WriteOnlyCell(ws, value=value)
+                cell.font = font
+                if fill is not None:
+                    cell.fill = fill
+                return cell
+            
+            bold = Font(bold=True)
+            header_fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
             
             # Title - No merge cells to avoid errors
             from app.config import SHOP_DISPLAY_NAME, SHOP_LOCATION, SHOP_CONTACT
-            ws['A1'] = SHOP_DISPLAY_NAME
-            ws['A1'].font = Font(bold=True, size=16)
-            ws['A2'] = f"Location: {SHOP_LOCATION}"
-            ws['A3'] = f"Contact: {SHOP_CONTACT}"
-            ws['A4'] = "Sales Report"
-            ws['A4'].font = Font(bold=True, size=14)
+            start_dt, end_dt = self.get_date_range_from_ui()
+            location = f"Location: {SHOP_LOCATION}"
+            contact = f"Contact: {SHOP_CONTACT}"
+            period = f"Period: {start_dt.strftime('%Y-%m-%d')} to {end_dt.strftime('%Y-%m-%d')}"
+            
+            # Column widths have to be set before any row is written, so
+            # size them from the values that are about to go out
+            headers = ('Sale ID', 'Date', 'Cashier', 'Items', 'Total', 'Profit')
+            column_values = [[SHOP_DISPLAY_NAME, location, contact, "Sales Report", period, 'Summary', 'Metric']]
+            column_values[0] += [metric for metric, _ in self._last_summary]
+            column_values.append(['Value'] + [value for _, value in self._last_summary])
+            if self._last_report_rows:
+                for col, header in enumerate(headers):
+                    if col >= len(column_values):
+                        column_values.append([])
+                    column_values[col].append(header)
+                    column_values[col].extend(row[col] for row in self._last_report_rows)
+            for col, values in enumerate(column_values, 1):
+                ws.column_dimensions[get_column_letter(col)].width = min(max(len(str(v)) for v in values) + 2, 50)
+            
+            ws.append([styled(SHOP_DISPLAY_NAME, Font(bold=True, size=16))])
+            ws.append([location])
+            ws.append([contact])
+            ws.append([styled("Sales Report", Font(bold=True, size=14))])
             
             # Date range
-            start_dt, end_dt = self.get_date_range_from_ui()
-            ws['A5'] = f"Period: {start_dt.strftime('%Y-%m-%d')} to {end_dt.strftime('%Y-%m-%d')}"
+            ws.append([period])
             
             # Summary
-            row = 7
-            ws[f'A{row}'] = 'Summary'
-            ws[f'A{row}'].font = Font(bold=True)
-            row += 1
-            
-            summary_headers = ['Metric', 'Value']
-            for col, header in enumerate(summary_headers, 1):
-                cell = ws.cell(row, col, header)
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
-            
-            row += 1
-            ws.cell(row, 1, 'Total Sales')
-            ws.cell(row, 2, self.total_sales_label.text().split(': ')[1])
-            row += 1
-            ws.cell(row, 1, 'Total Transactions')
-            ws.cell(row, 2, self.total_transactions_label.text().split(': ')[1])
-            row += 1
-            ws.cell(row, 1, 'Total Cost')
-            ws.cell(row, 2, self.total_cost_label.text().split(': ')[1])
-            row += 1
-            ws.cell(row, 1, 'Total Profit')
-            ws.cell(row, 2, self.total_profit_label.text().split(': ')[1])
+            ws.append([])
+            ws.append([styled('Summary', bold)])
+            ws.append([styled(header, bold, header_fill) for header in ('Metric', 'Value')])
+            for metric, value in self._last_summary:
+                ws.append([metric, value])
             
             # Sales table
-            row += 2
-            if self.table.rowCount() > 0:
-                headers = ['Sale ID', 'Date', 'Cashier', 'Items', 'Total', 'Profit']
-                for col, header in enumerate(headers, 1):
-                    cell = ws.cell(row, col, header)
-                    cell.font = Font(bold=True)
-                    cell.fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
-                
-                row += 1
-                for table_row in range(self.table.rowCount()):
-                    for col in range(self.table.columnCount()):
-                        item = self.table.item(table_row, col)
-                        ws.cell(row, col + 1, item.text() if item else '')
-                    row += 1
-            
-            # Auto-adjust column widths
-            for column in ws.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                ws.column_dimensions[column_letter].width = adjusted_width
+            ws.append([])
+            if self._last_report_rows:
+                ws.append([styled(header, bold, header_fill) for header in headers])
+                for report_row in self._last_report_rows:
+                    ws.append(report_row)
             
             wb.save(filename)
             show_info_dialog(self, "Success", f"Report exported to Excel:\n{filename}")
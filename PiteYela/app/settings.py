@@ -2,66 +2,62 @@
 Settings and configuration module for Alcohol POS System.
 Handles printer configuration, barcode scanner settings, and system preferences.
 """
-import json
+import copy
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Callable, Dict, Tuple
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QFormLayout,
                              QLineEdit, QPushButton, QLabel, QComboBox,
                              QGroupBox, QMessageBox, QTabWidget)
-from PyQt6.QtCore import Qt
-from app.config import BASE_DIR
+from PyQt6.QtCore import Qt, pyqtSignal
 from app.auth import is_admin
 from app.utils import show_error_dialog, show_info_dialog
+from app.settings_store import (SETTINGS_FILE, _DEFAULT_SETTINGS, get_cached_settings,
+                                load_settings, invalidate_settings_cache, save_settings,
+                                get_default_settings)
 
-SETTINGS_FILE = BASE_DIR / "settings.json"
-
-def load_settings() -> Dict:
-    """Load settings from file."""
-    if SETTINGS_FILE.exists():
-        try:
-            with open(SETTINGS_FILE, 'r') as f:
-                return json.load(f)
-        except:
-            pass
-    return get_default_settings()
-
-def save_settings(settings: Dict) -> bool:
-    """Save settings to file."""
-    try:
-        BASE_DIR.mkdir(parents=True, exist_ok=True)
-        with open(SETTINGS_FILE, 'w') as f:
-            json.dump(settings, f, indent=2)
-        return True
-    except Exception as e:
-        print(f"Error saving settings: {e}")
-        return False
-
-def get_default_settings() -> Dict:
-    """Get default settings."""
-    return {
-        "printer": {
-            "type": "file",
-            "usb_vendor_id": "",
-            "usb_product_id": "",
-            "serial_port": "COM1",
-            "baudrate": 9600
-        },
-        "barcode": {
-            "scanner_type": "keyboard",
-            "suffix": "\n",
-            "prefix": ""
-        },
-        "shop": {
-            "name": "Alcohol POS Store",
-            "address": "",
-            "phone": "",
-            "email": ""
-        }
+_BUTTON_CSS = """
+    QPushButton {
+        background-color: white;
+        color: black;
+        border: 2px solid #000000;
+        padding: 8px 16px;
+        border-radius: 0px;
+        font-weight: bold;
+    }
+    QPushButton:hover {
+        background-color: #f0f0f0;
+        border: 2px solid #000000;
     }
+"""
 
 class SettingsWindow(QWidget):
     """Settings configuration window (Admin only)."""
     
+    # Emitted with the new settings after they are saved
+    settingsChanged = pyqtSignal(dict)
+    
+    # Settings section -> (key, field attribute, strip whitespace) for each
+    # form field; the baudrate is parsed on its own
+    FORM_FIELDS = {
+        "printer": (
+            ("type", "printer_type_combo", False),
+            ("usb_vendor_id", "usb_vendor_input", True),
+            ("usb_product_id", "usb_product_input", True),
+            ("serial_port", "serial_port_input", True),
+        ),
+        "barcode": (
+            ("scanner_type", "scanner_type_combo", False),
+            ("prefix", "barcode_prefix_input", False),
+            ("suffix", "barcode_suffix_input", False),
+        ),
+        "shop": (
+            ("name", "shop_name_input", True),
+            ("address", "shop_address_input", True),
+            ("phone", "shop_phone_input", True),
+            ("email", "shop_email_input", True),
+        ),
+    }
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         if not is_admin():
@@ -74,6 +70,8 @@ class SettingsWindow(QWidget):
         self.setWindowModality(Qt.WindowModality.WindowModal)
         
         self.settings = load_settings()
+        # Compared against on save, to skip writing settings nobody changed
+        self._original_settings = copy.deepcopy(self.settings)
         
         layout = QVBoxLayout()
         
@@ -86,21 +84,23 @@ class SettingsWindow(QWidget):
         layout.addLayout(back_layout)
         
         # Tabs
-        tabs = QTabWidget()
+        self.tabs = QTabWidget()
         
         # Printer settings tab
         printer_tab = self.create_printer_tab()
-        tabs.addTab(printer_tab, "Printer")
-        
-        # Barcode scanner tab
-        barcode_tab = self.create_barcode_tab()
-        tabs.addTab(barcode_tab, "Barcode Scanner")
+        self.tabs.addTab(printer_tab, "Printer")
         
-        # Shop info tab
-        shop_tab = self.create_shop_tab()
-        tabs.addTab(shop_tab, "Shop Information")
+        # The other tabs start as empty pages and are filled in the first
+        # time they are opened; tab index -> (settings section, builder)
+        self._lazy_tabs: Dict[int, Tuple[str, Callable[[], QWidget]]] = {}
+        for name, section, builder in (("Barcode Scanner", "barcode", self.create_barcode_tab),
+                                       ("Shop Information", "shop", self.create_shop_tab)):
+            page = QWidget()
+            QVBoxLayout(page).setContentsMargins(0, 0, 0, 0)
+            self._lazy_tabs[self.tabs.addTab(page, name)] = (section, builder)
+        self.tabs.currentChanged.connect(self._build_tab)
         
-        layout.addWidget(tabs)
+        layout.addWidget(self.tabs)
         
         # Buttons
         button_layout = QHBoxLayout()
@@ -109,57 +109,62 @@ class SettingsWindow(QWidget):
         self.cancel_btn = QPushButton("Cancel")
         self.cancel_btn.clicked.connect(self.close)
         
-        # Apply button styles
-        button_style = """
-            QPushButton {
-                background-color: white;
-                color: black;
-                border: 2px solid #000000;
-                padding: 8px 16px;
-                border-radius: 0px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #f0f0f0;
-                border: 2px solid #000000;
-            }
-        """
-        self.save_btn.setStyleSheet(button_style)
-        self.cancel_btn.setStyleSheet(button_style)
-        
         button_layout.addStretch()
         button_layout.addWidget(self.save_btn)
         button_layout.addWidget(self.cancel_btn)
         
-        layout.addLayout(button_layout)
+        # The buttons sit in one container carrying the stylesheet, so it
+        # is parsed once and both buttons inherit it
+        button_bar = QWidget()
+        button_bar.setStyleSheet(_BUTTON_CSS)
+        button_layout.setContentsMargins(0, 0, 0, 0)
+        button_bar.setLayout(button_layout)
+        layout.addWidget(button_bar)
         self.setLayout(layout)
     
+    def _build_tab(self, index: int):
+        """Fill in a lazily created tab the first time it is shown."""
+        entry = self._lazy_tabs.pop(index, None)
+        if entry is None:
+            return
+        # The form is assembled off-screen (its layout is only attached at
+        # the end), and the page repaints once after it has been added
+        page = self.tabs.widget(index)
+        page.setUpdatesEnabled(False)
+        try:
+            page.layout().addWidget(entry[1]())
+        finally:
+            page.setUpdatesEnabled(True)
+    
     def create_printer_tab(self) -> QWidget:
         """Create printer settings tab."""
         widget = QWidget()
         layout = QFormLayout()
         
+        # Section looked up once; a file without it shows the defaults
+        printer = self.settings.get("printer") or _DEFAULT_SETTINGS["printer"]
+        
         self.printer_type_combo = QComboBox()
         self.printer_type_combo.addItems(["file", "usb", "serial"])
-        self.printer_type_combo.setCurrentText(self.settings.get("printer", {}).get("type", "file"))
+        self.printer_type_combo.setCurrentText(printer.get("type", "file"))
         layout.addRow("Printer Type:", self.printer_type_combo)
         
         self.usb_vendor_input = QLineEdit()
-        self.usb_vendor_input.setText(self.settings.get("printer", {}).get("usb_vendor_id", ""))
+        self.usb_vendor_input.setText(printer.get("usb_vendor_id", ""))
         self.usb_vendor_input.setPlaceholderText("e.g., 0x04f9")
         layout.addRow("USB Vendor ID:", self.usb_vendor_input)
         
         self.usb_product_input = QLineEdit()
-        self.usb_product_input.setText(self.settings.get("printer", {}).get("usb_product_id", ""))
+        self.usb_product_input.setText(printer.get("usb_product_id", ""))
         self.usb_product_input.setPlaceholderText("e.g., 0x2016")
         layout.addRow("USB Product ID:", self.usb_product_input)
         
         self.serial_port_input = QLineEdit()
-        self.serial_port_input.setText(self.settings.get("printer", {}).get("serial_port", "COM1"))
+        self.serial_port_input.setText(printer.get("serial_port", "COM1"))
         layout.addRow("Serial Port:", self.serial_port_input)
         
         self.baudrate_input = QLineEdit()
-        self.baudrate_input.setText(str(self.settings.get("printer", {}).get("baudrate", 9600)))
+        self.baudrate_input.setText(str(printer.get("baudrate", 9600)))
         layout.addRow("Baudrate:", self.baudrate_input)
         
         widget.setLayout(layout)
@@ -170,17 +175,19 @@ class SettingsWindow(QWidget):
         widget = QWidget()
         layout = QFormLayout()
         
+        barcode = self.settings.get("barcode") or _DEFAULT_SETTINGS["barcode"]
+        
         self.scanner_type_combo = QComboBox()
         self.scanner_type_combo.addItems(["keyboard", "serial"])
-        self.scanner_type_combo.setCurrentText(self.settings.get("barcode", {}).get("scanner_type", "keyboard"))
+        self.scanner_type_combo.setCurrentText(barcode.get("scanner_type", "keyboard"))
         layout.addRow("Scanner Type:", self.scanner_type_combo)
         
         self.barcode_prefix_input = QLineEdit()
-        self.barcode_prefix_input.setText(self.settings.get("barcode", {}).get("prefix", ""))
+        self.barcode_prefix_input.setText(barcode.get("prefix", ""))
         layout.addRow("Barcode Prefix:", self.barcode_prefix_input)
         
         self.barcode_suffix_input = QLineEdit()
-        self.barcode_suffix_input.setText(self.settings.get("barcode", {}).get("suffix", "\n"))
+        self.barcode_suffix_input.setText(barcode.get("suffix", "\n"))
         layout.addRow("Barcode Suffix:", self.barcode_suffix_input)
         
         info_label = QLabel("Note: Most barcode scanners work as keyboard input.\nSuffix is usually 'Enter' key (\\n)")
@@ -195,20 +202,22 @@ class SettingsWindow(QWidget):
         widget = QWidget()
         layout = QFormLayout()
         
+        shop = self.settings.get("shop") or _DEFAULT_SETTINGS["shop"]
+        
         self.shop_name_input = QLineEdit()
-        self.shop_name_input.setText(self.settings.get("shop", {}).get("name", "Alcohol POS Store"))
+        self.shop_name_input.setText(shop.get("name", "Alcohol POS Store"))
         layout.addRow("Shop Name:", self.shop_name_input)
         
         self.shop_address_input = QLineEdit()
-        self.shop_address_input.setText(self.settings.get("shop", {}).get("address", ""))
+        self.shop_address_input.setText(shop.get("address", ""))
         layout.addRow("Address:", self.shop_address_input)
         
         self.shop_phone_input = QLineEdit()
-        self.shop_phone_input.setText(self.settings.get("shop", {}).get("phone", ""))
+        self.shop_phone_input.setText(shop.get("phone", ""))
         layout.addRow("Phone:", self.shop_phone_input)
         
         self.shop_email_input = QLineEdit()
-        self.shop_email_input.setText(self.settings.get("shop", {}).get("email", ""))
+        self.shop_email_input.setText(shop.get("email", ""))
         layout.addRow("Email:", self.shop_email_input)
         
         widget.setLayout(layout)
@@ -216,29 +225,37 @@ class SettingsWindow(QWidget):
     
     def save_all_settings(self):
         """Save all settings."""
-        # Update settings dict
-        self.settings["printer"] = {
-            "type": self.printer_type_combo.currentText(),
-            "usb_vendor_id": self.usb_vendor_input.text().strip(),
-            "usb_product_id": self.usb_product_input.text().strip(),
-            "serial_port": self.serial_port_input.text().strip(),
-            "baudrate": int(self.baudrate_input.text()) if self.baudrate_input.text().isdigit() else 9600
-        }
-        
-        self.settings["barcode"] = {
-            "scanner_type": self.scanner_type_combo.currentText(),
-            "prefix": self.barcode_prefix_input.text(),
-            "suffix": self.barcode_suffix_input.text()
-        }
-        
-        self.settings["shop"] = {
-            "name": self.shop_name_input.text().strip(),
-            "address": self.shop_address_input.text().strip(),
-            "phone": self.shop_phone_input.text().strip(),
-            "email": self.shop_email_input.text().strip()
-        }
+        # Read the field once; anything that isn't a positive number
+        # falls back to the default
+        try:
+            baudrate = int(self.baudrate_input.text().strip())
+        except ValueError:
+            baudrate = 9600
+        if baudrate <= 0:
+            baudrate = 9600
+        
+        # Update settings dict from the form. Sections whose tab was never
+        # opened keep their loaded values, with defaults filling in any
+        # missing keys
+        unopened = {section for section, _ in self._lazy_tabs.values()}
+        for section, fields in self.FORM_FIELDS.items():
+            if section in unopened:
+                self.settings[section] = {**_DEFAULT_SETTINGS[section], **(self.settings.get(section) or {})}
+                continue
+            values = {}
+            for key, attr, strip in fields:
+                field = getattr(self, attr)
+                text = field.currentText() if isinstance(field, QComboBox) else field.text()
+                values[key] = text.strip() if strip else text
+            self.settings[section] = values
+        self.settings["printer"]["baudrate"] = baudrate
+        
+        if self.settings == self._original_settings:
+            self.close()
+            return
         
         if save_settings(self.settings):
+            self.settingsChanged.emit(self.settings)
             show_info_dialog(self, "Success", "Settings saved successfully!")
             self.close()
         else:
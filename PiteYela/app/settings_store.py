@@ -0,0 +1,119 @@
+"""
+Settings storage for Alcohol POS System.
+Reads and writes settings.json with a parsed-settings cache. Kept free of
+GUI code so the POS screen and printer can read settings without
+importing the settings window.
+"""
+import copy
+import json
+import os
+from typing import Dict, Optional, Tuple
+from app.config import BASE_DIR, ensure_dirs
+
+# orjson parses and serializes straight from/to UTF-8 bytes; the standard
+# library json module is used when it isn't installed
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+SETTINGS_FILE = BASE_DIR / "settings.json"
+
+# New settings are written here first, then renamed over SETTINGS_FILE so
+# a crash mid-save never leaves a half-written file behind
+SETTINGS_TMP_FILE = SETTINGS_FILE.with_suffix('.json.tmp')
+
+# BASE_DIR only needs creating once per process, on the first save
+_settings_dir_ready = False
+
+# Settings used when settings.json is missing or unreadable. Shared and
+# never mutated; get_default_settings() hands out copies
+_DEFAULT_SETTINGS = {
+    "printer": {
+        "type": "file",
+        "usb_vendor_id": "",
+        "usb_product_id": "",
+        "serial_port": "COM1",
+        "baudrate": 9600
+    },
+    "barcode": {
+        "scanner_type": "keyboard",
+        "suffix": "\n",
+        "prefix": ""
+    },
+    "shop": {
+        "name": "Alcohol POS Store",
+        "address": "",
+        "phone": "",
+        "email": ""
+    }
+}
+
+# Parsed settings with the settings file's mtime when they were read, or
+# None while the file doesn't exist; a changed mtime means re-read
+_settings_cache: Optional[Tuple[Optional[int], Dict]] = None
+
+def _settings_mtime() -> Optional[int]:
+    """Modification time of the settings file, or None if it is missing."""
+    try:
+        return SETTINGS_FILE.stat().st_mtime_ns
+    except OSError:
+        return None
+
+def _read_settings() -> Dict:
+    """Parse the settings file, falling back to the defaults."""
+    try:
+        # One read of the whole (small) file, then parse the buffer
+        data = SETTINGS_FILE.read_bytes()
+        return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+    except (OSError, ValueError):
+        # The cache is read-only and load_settings() copies, so the shared
+        # defaults can be handed back as they are
+        return _DEFAULT_SETTINGS
+
+def get_cached_settings() -> Dict:
+    """
+    Get the shared parsed settings, re-reading the file only when it changed.
+    
+    Callers must treat the returned dict as read-only; use load_settings()
+    for a copy that can be edited.
+    """
+    global _settings_cache
+    mtime = _settings_mtime()
+    if _settings_cache is None or _settings_cache[0] != mtime:
+        _settings_cache = (mtime, _read_settings())
+    return _settings_cache[1]
+
+def load_settings() -> Dict:
+    """Load settings from file as a private, editable copy."""
+    return copy.deepcopy(get_cached_settings())
+
+def invalidate_settings_cache() -> None:
+    """Make the next get_cached_settings() call read the file again."""
+    global _settings_cache
+    _settings_cache = None
+
+def save_settings(settings: Dict) -> bool:
+    """Save settings to file."""
+    global _settings_cache, _settings_dir_ready
+    try:
+        if not _settings_dir_ready:
+            ensure_dirs()
+            _settings_dir_ready = True
+        # Serialize first so the file gets one write rather than one per token
+        if ORJSON_AVAILABLE:
+            payload = orjson.dumps(settings, option=orjson.OPT_INDENT_2)
+        else:
+            payload = json.dumps(settings, indent=2).encode('utf-8')
+        SETTINGS_TMP_FILE.write_bytes(payload)
+        os.replace(SETTINGS_TMP_FILE, SETTINGS_FILE)
+        _settings_cache = (_settings_mtime(), copy.deepcopy(settings))
+        return True
+    except Exception as e:
+        print(f"Error saving settings: {e}")
+        return False
+
+def get_default_settings() -> Dict:
+    """Get default settings."""
+    return copy.deepcopy(_DEFAULT_SETTINGS)
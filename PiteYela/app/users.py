@@ -2,15 +2,294 @@
 User management module for Alcohol POS System.
 Admin-only user creation, editing, and management.
 """
-from typing import Optional, List, Dict
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableWidget,
-                             QTableWidgetItem, QPushButton, QLineEdit, QLabel,
-                             QDialog, QFormLayout, QComboBox, QMessageBox, QCheckBox)
-from PyQt6.QtCore import Qt
+from operator import itemgetter
+from typing import Callable, Optional, List, Dict, Sequence, Tuple
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableView,
+                             QPushButton, QLineEdit, QLabel, QStyle,
+                             QDialog, QFormLayout, QComboBox, QMessageBox, QCheckBox,
+                             QStyledItemDelegate)
+from PyQt6.QtCore import (Qt, QAbstractTableModel, QEvent, QModelIndex, QObject, QRunnable,
+                          QSize, QThreadPool, pyqtSignal)
+from PyQt6.QtGui import QColor, QPen
 from app.database import get_connection
-from app.auth import is_admin, create_user, get_all_users, hash_password, verify_password
+from app.auth import is_admin, get_current_user, create_user, get_all_users, hash_password, verify_password
 from app.utils import show_error_dialog
 
+# Stylesheets shared by the user-management window and its dialogs,
+# kept as constants instead of literals rebuilt on every open
+_WHITE_CSS = "background-color: white;"
+_HEADER_CSS = "font-size: 14px; font-weight: bold; padding: 10px; background-color: #f0f0f0; border: 2px solid #ccc;"
+_SUMMARY_CSS = "font-weight: bold; font-size: 12px; padding: 10px; background-color: #e8f5e9; border: 2px solid #4CAF50;"
+_DETAIL_TABLE_CSS = "border: 2px solid #ccc;"
+_USERS_TABLE_CSS = """
+    QTableView {
+        border: 2px solid #ccc;
+        gridline-color: #e0e0e0;
+        background-color: white;
+        selection-background-color: #4CAF50;
+    }
+    QTableView::item:selected {
+        background-color: #4CAF50;
+        color: white;
+    }
+"""
+_BUTTON_CSS = """
+    QPushButton {
+        background-color: white;
+        color: black;
+        border: 2px solid #000000;
+        padding: 8px 16px;
+        border-radius: 0px;
+        font-weight: bold;
+    }
+    QPushButton:hover {
+        background-color: #f0f0f0;
+        border: 2px solid #000000;
+    }
+"""
+# Close buttons in the transaction dialogs are a little wider
+_CLOSE_BUTTON_CSS = """
+    QPushButton {
+        background-color: white;
+        color: black;
+        border: 2px solid #000000;
+        padding: 8px 20px;
+        border-radius: 0px;
+        font-weight: bold;
+    }
+    QPushButton:hover {
+        background-color: #f0f0f0;
+        border: 2px solid #000000;
+    }
+"""
+
+class RowTableModel(QAbstractTableModel):
+    """
+    Read-only table model over a list of row tuples.
+    
+    Cells are only turned into display text by their column's formatter
+    when the view asks for them, so filling a table costs one list
+    assignment however many rows it has.
+    """
+    
+    def __init__(self, headers: Sequence[str], formatters: Sequence[Callable] = (), parent=None):
+        super().__init__(parent)
+        self._headers = list(headers)
+        # One formatter per column; missing ones fall back to str
+        self._formatters = list(formatters) + [str] * (len(self._headers) - len(formatters))
+        self._rows: List[Tuple] = []
+    
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+    
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._headers)
+    
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and index.isValid():
+            return self._formatters[index.column()](self._rows[index.row()][index.column()])
+        return None
+    
+    def headerData(self, section: int, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self._headers[section]
+        return super().headerData(section, orientation, role)
+    
+    def set_rows(self, rows: Sequence[Tuple]):
+        """Replace every row of the model."""
+        self.beginResetModel()
+        self._rows = list(rows)
+        self.endResetModel()
+    
+    def row(self, row: int) -> Tuple:
+        """Get the raw (unformatted) values of a row."""
+        return self._rows[row]
+    
+    def insert_row(self, row: int, values: Tuple):
+        """Insert one row before position row, leaving the others untouched."""
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._rows.insert(row, values)
+        self.endInsertRows()
+    
+    def update_row(self, row: int, values: Tuple):
+        """Replace one row's values and repaint just that row."""
+        self._rows[row] = values
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self._headers) - 1))
+    
+    def find_row(self, value, column: int = 0) -> Optional[int]:
+        """Get the first row whose column holds value, or None."""
+        for row, values in enumerate(self._rows):
+            if values[column] == value:
+                return row
+        return None
+
+class PagedTableModel(RowTableModel):
+    """
+    RowTableModel that pulls its rows from a page loader as the view
+    scrolls, instead of holding every row from the start.
+    
+    The view calls canFetchMore()/fetchMore() when it nears the last
+    loaded row, so only the pages actually shown are ever queried.
+    """
+    
+    def __init__(self, headers: Sequence[str], formatters: Sequence[Callable] = (),
+                 load_page: Optional[Callable[[int, int], List[Tuple]]] = None,
+                 page_size: int = 200, parent=None):
+        super().__init__(headers, formatters, parent)
+        # load_page(offset, limit) returns the next rows in display order
+        self._load_page = load_page
+        self._page_size = page_size
+        self._total = 0
+    
+    def set_total(self, total: int):
+        """Drop the loaded rows and expect total rows from the loader."""
+        self.beginResetModel()
+        self._rows = []
+        self._total = total
+        self.endResetModel()
+    
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and len(self._rows) < self._total
+    
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._load_page is None:
+            return
+        start = len(self._rows)
+        rows = self._load_page(start, min(self._page_size, self._total - start))
+        if not rows:
+            # Rows went away since the count was taken; stop asking
+            self._total = start
+            return
+        self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+        self._rows.extend(rows)
+        self.endInsertRows()
+
+# Display labels for the users table, looked up instead of re-formatted per cell
+ROLE_LABELS = {'admin': 'Admin', 'cashier': 'Cashier'}
+STATUS_LABELS = ('Inactive', 'Active')
+
+# One users-table row, for patching the table after a user is added
+_USER_ROW_SQL = "SELECT id, username, full_name, role, is_active FROM users WHERE username = ?"
+
+# Picks a users-table row out of a get_all_users() dict
+_user_row = itemgetter('id', 'username', 'full_name', 'role', 'is_active')
+
+# Sales rows loaded per page in the transactions view
+TRANSACTIONS_PAGE_SIZE = 200
+
+# Count and totals for one cashier's sales, so the summary doesn't need
+# every row; cost comes from a subquery so joins don't repeat grand_total
+_CASHIER_TOTALS_SQL = """
+    SELECT COUNT(*), COALESCE(SUM(grand_total), 0),
+           (SELECT COALESCE(SUM(p.cost_price * si.quantity), 0)
+            FROM sales s
+            JOIN sale_items si ON s.id = si.sale_id
+            JOIN products p ON p.id = si.product_id
+            WHERE s.cashier_id = ?)
+    FROM sales
+    WHERE cashier_id = ?
+"""
+
+# One page of a cashier's sales with their cost; items whose product no
+# longer exists add no cost. The page is picked first, walking
+# idx_sales_cashier_date backwards, so only its own sales are joined and
+# sorted. s.id breaks sale_date ties so pages never overlap or skip a row
+_CASHIER_SALES_PAGE_SQL = """
+    SELECT s.id, s.sale_date, COUNT(si.id), s.grand_total,
+           COALESCE(SUM(p.cost_price * si.quantity), 0)
+    FROM (
+        SELECT id, sale_date, grand_total
+        FROM sales
+        WHERE cashier_id = ?
+        ORDER BY sale_date DESC, id DESC
+        LIMIT ? OFFSET ?
+    ) s
+    LEFT JOIN sale_items si ON s.id = si.sale_id
+    LEFT JOIN products p ON p.id = si.product_id
+    GROUP BY s.id
+    ORDER BY s.sale_date DESC, s.id DESC
+"""
+
+# A sale's items in the details table's column order; init_db adds the
+# milliliters column to older databases, so only NULLs need handling
+_SALE_ITEMS_SQL = """
+    SELECT product_id, product_name, COALESCE(milliliters, 0), quantity, unit_price, line_total
+    FROM sale_items
+    WHERE sale_id = ?
+    ORDER BY id
+"""
+
+# Rows sampled when sizing table columns to their contents
+RESIZE_SAMPLE_ROWS = 200
+
+def fill_view(view: QTableView, rows: Sequence[Tuple]) -> None:
+    """Load rows into a view's RowTableModel and size its columns, repainting once."""
+    view.setUpdatesEnabled(False)
+    try:
+        view.model().set_rows(rows)
+        view.resizeColumnsToContents()
+    finally:
+        view.setUpdatesEnabled(True)
+
+class ButtonDelegate(QStyledItemDelegate):
+    """
+    Paints a column's cells as push buttons and reports clicks on them.
+    
+    Nothing is created per row; the view only calls paint() for the
+    visible cells.
+    """
+    
+    # Emitted with the row of the clicked cell
+    clicked = pyqtSignal(int)
+    
+    def paint(self, painter, option, index):
+        rect = option.rect.adjusted(3, 3, -3, -3)
+        hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+        painter.save()
+        painter.fillRect(rect, QColor("#f0f0f0" if hovered else "white"))
+        painter.setPen(QPen(QColor("#000000"), 2))
+        painter.drawRect(rect)
+        font = option.font
+        font.setBold(True)
+        painter.setFont(font)
+        painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, str(index.data()))
+        painter.restore()
+    
+    def sizeHint(self, option, index) -> QSize:
+        # Room for the border and some padding around the label
+        size = super().sizeHint(option, index)
+        return QSize(size.width() + 26, size.height() + 10)
+    
+    def editorEvent(self, event, model, option, index) -> bool:
+        if (event.type() == QEvent.Type.MouseButtonRelease
+                and event.button() == Qt.MouseButton.LeftButton
+                and option.rect.contains(event.position().toPoint())):
+            self.clicked.emit(index.row())
+            return True
+        return False
+
+class HashSignals(QObject):
+    """Signals for HashWorker; QRunnable itself can't carry signals."""
+    
+    # The password hash, or None if hashing failed
+    finished = pyqtSignal(object)
+
+class HashWorker(QRunnable):
+    """Runnable that hashes a password off the GUI thread."""
+    
+    def __init__(self, password: str):
+        super().__init__()
+        self.password = password
+        self.signals = HashSignals()
+    
+    def run(self):
+        """Hash the password and report the result back to the GUI thread."""
+        password_hash = None
+        try:
+            password_hash = hash_password(self.password)
+        finally:
+            self.signals.finished.emit(password_hash)
+
 class UserDialog(QDialog):
     """Dialog for adding/editing users."""
     
@@ -54,22 +333,8 @@ class UserDialog(QDialog):
         self.save_btn = QPushButton("Save")
         self.cancel_btn = QPushButton("Cancel")
         
-        button_style = """
-            QPushButton {
-                background-color: white;
-                color: black;
-                border: 2px solid #000000;
-                padding: 8px 16px;
-                border-radius: 0px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #f0f0f0;
-                border: 2px solid #000000;
-            }
-        """
-        self.save_btn.setStyleSheet(button_style)
-        self.cancel_btn.setStyleSheet(button_style)
+        self.save_btn.setStyleSheet(_BUTTON_CSS)
+        self.cancel_btn.setStyleSheet(_BUTTON_CSS)
         
         button_layout.addWidget(self.save_btn)
         button_layout.addWidget(self.cancel_btn)
@@ -88,27 +353,24 @@ class UserDialog(QDialog):
     def load_user(self):
         """Load user data into form."""
         conn = get_connection()
-        try:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT username, full_name, role, is_active
-                FROM users
-                WHERE id = ?
-            """, (self.user_id,))
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT username, full_name, role, is_active
+            FROM users
+            WHERE id = ?
+        """, (self.user_id,))
+        
+        row = cursor.fetchone()
+        if row:
+            self.username_input.setText(row['username'])
+            self.username_input.setReadOnly(True)  # Can't change username
+            self.full_name_input.setText(row['full_name'])
             
-            row = cursor.fetchone()
-            if row:
-                self.username_input.setText(row['username'])
-                self.username_input.setReadOnly(True)  # Can't change username
-                self.full_name_input.setText(row['full_name'])
-                
-                index = self.role_combo.findText(row['role'])
-                if index >= 0:
-                    self.role_combo.setCurrentIndex(index)
-                
-                self.active_checkbox.setChecked(bool(row['is_active']))
-        finally:
-            conn.close()
+            index = self.role_combo.findText(row['role'])
+            if index >= 0:
+                self.role_combo.setCurrentIndex(index)
+            
+            self.active_checkbox.setChecked(bool(row['is_active']))
     
     def get_data(self) -> Dict:
         """Get form data."""
@@ -143,10 +405,12 @@ class UsersWindow(QWidget):
         if not is_admin():
             show_error_dialog(self, "Access Denied", "Admin access required")
             return
+        # The logged-in user can't change while this window is open
+        self._current_user = get_current_user()
         
         self.setWindowTitle("PiteYelaHouseofWine_POS - User Management")
         self.resize(800, 500)
-        self.setStyleSheet("background-color: white;")
+        self.setStyleSheet(_WHITE_CSS)
         self.setWindowModality(Qt.WindowModality.WindowModal)
         
         layout = QVBoxLayout()
@@ -172,26 +436,19 @@ class UsersWindow(QWidget):
         
         layout.addLayout(button_layout)
         
-        # Table
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels([
-            "ID", "Username", "Full Name", "Role", "Status"
-        ])
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.table.setStyleSheet("""
-            QTableWidget {
-                border: 2px solid #ccc;
-                gridline-color: #e0e0e0;
-                background-color: white;
-                selection-background-color: #4CAF50;
-            }
-            QTableWidget::item:selected {
-                background-color: #4CAF50;
-                color: white;
-            }
-        """)
+        # Table; rows are (id, username, full_name, role, is_active)
+        self.table = QTableView()
+        self.users_model = RowTableModel(
+            ["ID", "Username", "Full Name", "Role", "Status"],
+            [str, str, str, lambda role: ROLE_LABELS.get(role) or role.title(),
+             lambda active: STATUS_LABELS[bool(active)]],
+            self.table
+        )
+        self.table.setModel(self.users_model)
+        self.table.horizontalHeader().setResizeContentsPrecision(RESIZE_SAMPLE_ROWS)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        self.table.setStyleSheet(_USERS_TABLE_CSS)
         
         layout.addWidget(self.table)
         
@@ -203,23 +460,55 @@ class UsersWindow(QWidget):
         self.delete_btn.clicked.connect(self.delete_user)
         self.refresh_btn.clicked.connect(self.refresh_table)
         
+        # Signals of password hashes still running on the thread pool
+        self._pending_hashes = set()
+        
         # Load data
         self.refresh_table()
     
     def refresh_table(self):
         """Refresh user table."""
-        users = get_all_users()
-        self.table.setRowCount(len(users))
+        fill_view(self.table, list(map(_user_row, get_all_users())))
+    
+    def replace_user_row(self, user_id: int, values: Tuple):
+        """Show new values for one user without reloading the table."""
+        row = self.users_model.find_row(user_id)
+        if row is None:
+            self.refresh_table()
+        else:
+            self.users_model.update_row(row, values)
+    
+    def selected_user(self) -> Optional[Tuple]:
+        """Get the (id, username, full_name, role, is_active) row of the selected user."""
+        selected = self.table.selectionModel().selectedIndexes()
+        if not selected:
+            return None
+        return self.users_model.row(selected[0].row())
+    
+    def hash_in_background(self, password: str, on_hashed: Callable[[str], None]):
+        """
+        Hash password on the thread pool, then call on_hashed with the hash.
         
-        for row_idx, user in enumerate(users):
-            self.table.setItem(row_idx, 0, QTableWidgetItem(str(user['id'])))
-            self.table.setItem(row_idx, 1, QTableWidgetItem(user['username']))
-            self.table.setItem(row_idx, 2, QTableWidgetItem(user['full_name']))
-            self.table.setItem(row_idx, 3, QTableWidgetItem(user['role'].title()))
-            status = "Active" if user['is_active'] else "Inactive"
-            self.table.setItem(row_idx, 4, QTableWidgetItem(status))
+        bcrypt is slow on purpose, so it must not run on the GUI thread.
+        Adding and editing users is disabled until the hash arrives.
+        """
+        worker = HashWorker(password)
+        signals = worker.signals
+        
+        def finished(password_hash: Optional[str]):
+            self._pending_hashes.discard(signals)
+            self.add_btn.setEnabled(True)
+            self.edit_btn.setEnabled(True)
+            if password_hash is None:
+                show_error_dialog(self, "Error", "Failed to hash the password")
+                return
+            on_hashed(password_hash)
         
-        self.table.resizeColumnsToContents()
+        signals.finished.connect(finished)
+        self._pending_hashes.add(signals)
+        self.add_btn.setEnabled(False)
+        self.edit_btn.setEnabled(False)
+        QThreadPool.globalInstance().start(worker)
     
     def add_user(self):
         """Open dialog to add new user."""
@@ -231,27 +520,38 @@ class UsersWindow(QWidget):
                 show_error_dialog(self, "Validation Error", msg)
                 return
             
-            success, error_msg = create_user(
-                username=data['username'],
-                password=data['password'],
-                role=data['role'],
-                full_name=data['full_name']
-            )
-            
-            if success:
-                self.refresh_table()
-                QMessageBox.information(self, "Success", "User added successfully")
-            else:
-                show_error_dialog(self, "Error", f"Failed to add user: {error_msg}")
+            # The user is inserted once the hash is ready
+            self.hash_in_background(data['password'],
+                                    lambda password_hash: self.insert_user(data, password_hash))
+    
+    def insert_user(self, data: Dict, password_hash: str):
+        """Create a user from add-dialog data and an already computed hash."""
+        success, error_msg = create_user(
+            username=data['username'],
+            password=data['password'],
+            role=data['role'],
+            full_name=data['full_name'],
+            password_hash=password_hash
+        )
+        
+        if success:
+            # Users are listed newest first, so the new one goes on top
+            cursor = get_connection().cursor()
+            cursor.row_factory = None
+            cursor.execute(_USER_ROW_SQL, (data['username'],))
+            self.users_model.insert_row(0, cursor.fetchone())
+            QMessageBox.information(self, "Success", "User added successfully")
+        else:
+            show_error_dialog(self, "Error", f"Failed to add user: {error_msg}")
     
     def edit_user(self):
         """Edit selected user."""
-        selected = self.table.selectedItems()
+        selected = self.selected_user()
         if not selected:
             show_error_dialog(self, "No Selection", "Please select a user to edit")
             return
         
-        user_id = int(self.table.item(selected[0].row(), 0).text())
+        user_id = selected[0]
         dialog = UserDialog(self, user_id)
         
         if dialog.exec():
@@ -261,49 +561,51 @@ class UsersWindow(QWidget):
                 show_error_dialog(self, "Validation Error", msg)
                 return
             
-            conn = get_connection()
-            try:
-                cursor = conn.cursor()
-                
-                # Update user
-                if data['password']:
+            if data['password']:
+                # A new password is saved once its hash is ready
+                self.hash_in_background(data['password'],
+                                        lambda password_hash: self.update_user(user_id, data, password_hash))
+            else:
+                self.update_user(user_id, data)
+    
+    def update_user(self, user_id: int, data: Dict, password_hash: Optional[str] = None):
+        """Save edit-dialog data, replacing the password when a hash is given."""
+        try:
+            is_active = 1 if data['is_active'] else 0
+            # Commits on success and rolls back if the UPDATE raises
+            with get_connection() as conn:
+                if password_hash:
                     # Update password
-                    password_hash = hash_password(data['password'])
-                    cursor.execute("""
+                    conn.execute("""
                         UPDATE users
                         SET full_name = ?, role = ?, is_active = ?, password_hash = ?
                         WHERE id = ?
-                    """, (data['full_name'], data['role'], 1 if data['is_active'] else 0,
-                          password_hash, user_id))
+                    """, (data['full_name'], data['role'], is_active, password_hash, user_id))
                 else:
                     # Don't update password
-                    cursor.execute("""
+                    conn.execute("""
                         UPDATE users
                         SET full_name = ?, role = ?, is_active = ?
                         WHERE id = ?
-                    """, (data['full_name'], data['role'], 1 if data['is_active'] else 0, user_id))
-                
-                conn.commit()
-                self.refresh_table()
-                QMessageBox.information(self, "Success", "User updated successfully")
-            except Exception as e:
-                show_error_dialog(self, "Error", f"Failed to update user: {str(e)}")
-            finally:
-                conn.close()
+                    """, (data['full_name'], data['role'], is_active, user_id))
+            
+            self.replace_user_row(user_id, (user_id, data['username'], data['full_name'],
+                                            data['role'], is_active))
+            QMessageBox.information(self, "Success", "User updated successfully")
+        except Exception as e:
+            show_error_dialog(self, "Error", f"Failed to update user: {str(e)}")
     
     def delete_user(self):
         """Delete selected user (deactivate instead of delete)."""
-        selected = self.table.selectedItems()
+        selected = self.selected_user()
         if not selected:
             show_error_dialog(self, "No Selection", "Please select a user to delete")
             return
         
-        user_id = int(self.table.item(selected[0].row(), 0).text())
-        username = self.table.item(selected[0].row(), 1).text()
+        user_id, username = selected[0], selected[1]
         
         # Prevent deleting yourself
-        from app.auth import get_current_user
-        current_user = get_current_user()
+        current_user = self._current_user
         if current_user and current_user['id'] == user_id:
             show_error_dialog(self, "Error", "You cannot delete your own account")
             return
@@ -315,154 +617,95 @@ class UsersWindow(QWidget):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            conn = get_connection()
             try:
-                cursor = conn.cursor()
-                cursor.execute("UPDATE users SET is_active = 0 WHERE id = ?", (user_id,))
-                conn.commit()
-                self.refresh_table()
+                with get_connection() as conn:
+                    conn.execute("UPDATE users SET is_active = 0 WHERE id = ?", (user_id,))
+                self.replace_user_row(user_id, selected[:4] + (0,))
                 QMessageBox.information(self, "Success", "User deactivated successfully")
             except Exception as e:
                 show_error_dialog(self, "Error", f"Failed to deactivate user: {str(e)}")
-            finally:
-                conn.close()
     
     def view_transactions(self):
         """View transactions for selected cashier."""
-        selected = self.table.selectedItems()
+        selected = self.selected_user()
         if not selected:
             show_error_dialog(self, "No Selection", "Please select a user to view transactions")
             return
         
-        user_id = int(self.table.item(selected[0].row(), 0).text())
-        username = self.table.item(selected[0].row(), 1).text()
-        full_name = self.table.item(selected[0].row(), 2).text()
+        user_id, username, full_name = selected[0], selected[1], selected[2]
         
         # Create transactions window
-        from PyQt6.QtWidgets import QDialog, QVBoxLayout, QTableWidget, QTableWidgetItem, QPushButton, QLabel, QHBoxLayout
-        from app.database import get_connection
+        from PyQt6.QtWidgets import QDialog, QVBoxLayout, QPushButton, QLabel, QHBoxLayout
         from app.utils import format_currency
         
         dialog = QDialog(self)
         dialog.setWindowTitle(f"PiteYelaHouseofWine_POS - Transactions for {full_name}")
         dialog.resize(900, 600)
-        dialog.setStyleSheet("background-color: white;")
+        dialog.setStyleSheet(_WHITE_CSS)
         
         layout = QVBoxLayout()
         
         # Header
         header_label = QLabel(f"Sales Transactions for: {full_name} ({username})")
-        header_label.setStyleSheet("font-size: 14px; font-weight: bold; padding: 10px; background-color: #f0f0f0; border: 2px solid #ccc;")
+        header_label.setStyleSheet(_HEADER_CSS)
         layout.addWidget(header_label)
         
-        # Table
-        table = QTableWidget()
-        table.setColumnCount(7)
-        table.setHorizontalHeaderLabels([
-            "Sale ID", "Date", "Items", "Total Sales", "Total Cost", "Profit", "Details"
-        ])
-        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        table.setStyleSheet("border: 2px solid #ccc;")
-        
-        # Load transactions
-        conn = get_connection()
+        # Table; rows are (sale_id, date, items, total, cost, profit, None)
+        def load_sales_page(offset: int, limit: int) -> List[Tuple]:
+            cursor = get_connection().cursor()
+            cursor.row_factory = None
+            cursor.execute(_CASHIER_SALES_PAGE_SQL, (user_id, limit, offset))
+            return [(sale_id, sale_date, item_count, grand_total, sale_cost,
+                     grand_total - sale_cost, None)
+                    for sale_id, sale_date, item_count, grand_total, sale_cost in cursor]
+        
+        table = QTableView()
+        model = PagedTableModel(
+            ["Sale ID", "Date", "Items", "Total Sales", "Total Cost", "Profit", "Details"],
+            [str, str, str, format_currency, format_currency, format_currency, lambda _: "View"],
+            load_sales_page, TRANSACTIONS_PAGE_SIZE, table
+        )
+        table.setModel(model)
+        table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        table.setVerticalScrollMode(QTableView.ScrollMode.ScrollPerPixel)
+        table.setStyleSheet(_DETAIL_TABLE_CSS)
+        table.setMouseTracking(True)  # Hover feedback on the View buttons
+        details_delegate = ButtonDelegate(table)
+        details_delegate.clicked.connect(lambda row: self.show_sale_details(model.row(row)[0]))
+        table.setItemDelegateForColumn(6, details_delegate)
+        table.horizontalHeader().setResizeContentsPrecision(RESIZE_SAMPLE_ROWS)
+        
+        # Load the totals, then only the first page of transactions; the
+        # view fetches the rest as it is scrolled
+        cursor = get_connection().cursor()
+        cursor.execute(_CASHIER_TOTALS_SQL, (user_id, user_id))
+        sale_count, total_sales, total_cost = cursor.fetchone()
+        total_profit = total_sales - total_cost
+        
+        table.setUpdatesEnabled(False)
         try:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT s.id, s.sale_date, s.grand_total, COUNT(si.id) as item_count
-                FROM sales s
-                LEFT JOIN sale_items si ON s.id = si.sale_id
-                WHERE s.cashier_id = ?
-                GROUP BY s.id
-                ORDER BY s.sale_date DESC
-            """, (user_id,))
-            
-            sales = cursor.fetchall()
-            table.setRowCount(len(sales))
-            
-            total_sales = 0.0
-            total_cost = 0.0
-            total_profit = 0.0
-            
-            for row_idx, sale in enumerate(sales):
-                sale_id = sale['id']
-                
-                # Get sale items to calculate cost and profit
-                cursor.execute("""
-                    SELECT si.product_id, si.quantity, si.unit_price, si.line_total,
-                           si.milliliters, p.cost_price
-                    FROM sale_items si
-                    JOIN products p ON si.product_id = p.id
-                    WHERE si.sale_id = ?
-                """, (sale_id,))
-                
-                items = cursor.fetchall()
-                sale_cost = sum(item['cost_price'] * item['quantity'] for item in items)
-                sale_profit = sale['grand_total'] - sale_cost
-                
-                total_sales += sale['grand_total']
-                total_cost += sale_cost
-                total_profit += sale_profit
-                
-                table.setItem(row_idx, 0, QTableWidgetItem(str(sale['id'])))
-                table.setItem(row_idx, 1, QTableWidgetItem(sale['sale_date']))
-                table.setItem(row_idx, 2, QTableWidgetItem(str(sale['item_count'])))
-                table.setItem(row_idx, 3, QTableWidgetItem(format_currency(sale['grand_total'])))
-                table.setItem(row_idx, 4, QTableWidgetItem(format_currency(sale_cost)))
-                table.setItem(row_idx, 5, QTableWidgetItem(format_currency(sale_profit)))
-                
-                # Details button
-                details_btn = QPushButton("View")
-                details_btn.setStyleSheet("""
-                    QPushButton {
-                        background-color: white;
-                        color: black;
-                        border: 2px solid #000000;
-                        padding: 5px 10px;
-                        border-radius: 0px;
-                        font-weight: bold;
-                    }
-                    QPushButton:hover {
-                        background-color: #f0f0f0;
-                        border: 2px solid #000000;
-                    }
-                """)
-                details_btn.clicked.connect(lambda checked, sid=sale_id: self.show_sale_details(sid))
-                table.setCellWidget(row_idx, 6, details_btn)
-            
+            model.set_total(sale_count)
+            model.fetchMore()
             table.resizeColumnsToContents()
-            
-            # Summary
-            summary_label = QLabel(
-                f"Total Sales: {format_currency(total_sales)} | "
-                f"Total Cost: {format_currency(total_cost)} | "
-                f"Total Profit: {format_currency(total_profit)} | "
-                f"Transactions: {len(sales)}"
-            )
-            summary_label.setStyleSheet("font-weight: bold; font-size: 12px; padding: 10px; background-color: #e8f5e9; border: 2px solid #4CAF50;")
-            layout.addWidget(summary_label)
-            
         finally:
-            conn.close()
+            table.setUpdatesEnabled(True)
+        
+        # Summary
+        summary_label = QLabel(
+            f"Total Sales: {format_currency(total_sales)} | "
+            f"Total Cost: {format_currency(total_cost)} | "
+            f"Total Profit: {format_currency(total_profit)} | "
+            f"Transactions: {sale_count}"
+        )
+        summary_label.setStyleSheet(_SUMMARY_CSS)
+        layout.addWidget(summary_label)
+        
         
         layout.addWidget(table)
         
         # Close button
         close_btn = QPushButton("Close")
-        close_btn.setStyleSheet("""
-            QPushButton {
-                background-color: white;
-                color: black;
-                border: 2px solid #000000;
-                padding: 8px 20px;
-                border-radius: 0px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #f0f0f0;
-                border: 2px solid #000000;
-            }
-        """)
+        close_btn.setStyleSheet(_CLOSE_BUTTON_CSS)
         close_btn.clicked.connect(dialog.close)
         button_layout = QHBoxLayout()
         button_layout.addStretch()
@@ -474,83 +717,41 @@ class UsersWindow(QWidget):
     
     def show_sale_details(self, sale_id: int):
         """Show detailed sale items."""
-        from PyQt6.QtWidgets import QDialog, QVBoxLayout, QTableWidget, QTableWidgetItem, QPushButton, QLabel, QHBoxLayout
-        from app.database import get_connection
+        from PyQt6.QtWidgets import QDialog, QVBoxLayout, QPushButton, QLabel, QHBoxLayout
         from app.utils import format_currency
         
         dialog = QDialog(self)
         dialog.setWindowTitle(f"PiteYelaHouseofWine_POS - Sale #{sale_id} Details")
         dialog.resize(700, 400)
-        dialog.setStyleSheet("background-color: white;")
+        dialog.setStyleSheet(_WHITE_CSS)
         
         layout = QVBoxLayout()
         
         header_label = QLabel(f"Sale #{sale_id} - Item Details")
-        header_label.setStyleSheet("font-size: 14px; font-weight: bold; padding: 10px; background-color: #f0f0f0; border: 2px solid #ccc;")
+        header_label.setStyleSheet(_HEADER_CSS)
         layout.addWidget(header_label)
         
-        table = QTableWidget()
-        table.setColumnCount(5)
-        table.setHorizontalHeaderLabels([
-            "Product ID", "Product Name", "Quantity", "Unit Price", "Line Total"
-        ])
-        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        table.setStyleSheet("border: 2px solid #ccc;")
+        # Rows are (product_id, name, milliliters, quantity, unit_price, line_total)
+        table = QTableView()
+        model = RowTableModel(
+            ["Product ID", "Product Name", "MLs", "Quantity", "Unit Price", "Line Total"],
+            [str, str, lambda mls: f"{mls}ml" if mls > 0 else "-", str, format_currency, format_currency],
+            table
+        )
+        table.setModel(model)
+        table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        table.setStyleSheet(_DETAIL_TABLE_CSS)
         
-        conn = get_connection()
-        try:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT product_id, product_name, quantity, unit_price, line_total, milliliters
-                FROM sale_items
-                WHERE sale_id = ?
-                ORDER BY id
-            """, (sale_id,))
-            
-            items = cursor.fetchall()
-            table.setRowCount(len(items))
-            
-            for row_idx, item in enumerate(items):
-                # Convert sqlite3.Row to dict if needed
-                if hasattr(item, 'keys'):
-                    item_dict = dict(item)
-                else:
-                    item_dict = item
-                
-                table.setItem(row_idx, 0, QTableWidgetItem(item_dict['product_id']))
-                table.setItem(row_idx, 1, QTableWidgetItem(item_dict['product_name']))
-                # Handle milliliters - may not exist in older databases
-                try:
-                    mls = item_dict['milliliters'] if item_dict.get('milliliters') is not None else 0
-                except (KeyError, TypeError):
-                    mls = 0
-                mls_str = f"{mls}ml" if mls > 0 else "-"
-                table.setItem(row_idx, 2, QTableWidgetItem(mls_str))
-                table.setItem(row_idx, 3, QTableWidgetItem(str(item_dict['quantity'])))
-                table.setItem(row_idx, 4, QTableWidgetItem(format_currency(item_dict['unit_price'])))
-                table.setItem(row_idx, 5, QTableWidgetItem(format_currency(item_dict['line_total'])))
-            
-            table.resizeColumnsToContents()
-        finally:
-            conn.close()
+        # Plain tuples in column order go straight into the model
+        cursor = get_connection().cursor()
+        cursor.row_factory = None
+        cursor.execute(_SALE_ITEMS_SQL, (sale_id,))
+        fill_view(table, cursor.fetchall())
         
         layout.addWidget(table)
         
         close_btn = QPushButton("Close")
-        close_btn.setStyleSheet("""
-            QPushButton {
-                background-color: white;
-                color: black;
-                border: 2px solid #000000;
-                padding: 8px 20px;
-                border-radius: 0px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #f0f0f0;
-                border: 2px solid #000000;
-            }
-        """)
+        close_btn.setStyleSheet(_CLOSE_BUTTON_CSS)
         close_btn.clicked.connect(dialog.close)
         button_layout = QHBoxLayout()
         button_layout.addStretch()
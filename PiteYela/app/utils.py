@@ -3,20 +3,33 @@ Shared utility functions for Alcohol POS System.
 Date utilities, currency formatting, validation, and error dialogs.
 """
 from datetime import datetime, timedelta
-from typing import Optional
+from functools import lru_cache
+from typing import List, Optional
 from PyQt6.QtWidgets import QMessageBox
 
+@lru_cache(maxsize=4096)
 def format_currency(amount: float) -> str:
-    """Format amount as currency string (Uganda Shillings)."""
+    """Format amount as currency string (Uganda Shillings).
+    
+    Cached because the same prices and totals are formatted over and over.
+    """
     return f"UGX {amount:,.0f}"
 
+_format_ugx = "UGX {:,.0f}".format
+
+def format_currency_many(amounts: List[float]) -> List[str]:
+    """Format a whole column of amounts the same way as format_currency."""
+    return [_format_ugx(amount) for amount in amounts]
+
 def format_date(date: datetime) -> str:
-    """Format date as string."""
-    return date.strftime("%Y-%m-%d")
+    """Format date as string (YYYY-MM-DD)."""
+    # isoformat() skips strftime's format parsing and gives the same text
+    return date.isoformat()[:10]
 
 def format_datetime(dt: datetime) -> str:
-    """Format datetime as string."""
-    return dt.strftime("%Y-%m-%d %H:%M:%S")
+    """Format datetime as string (YYYY-MM-DD HH:MM:SS)."""
+    # Dropping tzinfo keeps aware values free of a "+00:00" suffix, like strftime
+    return dt.replace(tzinfo=None).isoformat(' ', 'seconds')
 
 def parse_date(date_str: str) -> Optional[datetime]:
     """Parse date string to datetime."""
@@ -25,6 +38,9 @@ def parse_date(date_str: str) -> Optional[datetime]:
     except ValueError:
         return None
 
+# Offset from midnight to the last second of the same day
+_END_OF_DAY = timedelta(hours=23, minutes=59, seconds=59)
+
 def get_date_range(period: str) -> tuple[datetime, datetime]:
     """
     Get date range for a period.
@@ -36,7 +52,7 @@ def get_date_range(period: str) -> tuple[datetime, datetime]:
         (start_date, end_date)
     """
     today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    end_date = datetime.now().replace(hour=23, minute=59, second=59)
+    end_date = today + _END_OF_DAY
     
     if period == 'day':
         start_date = today
@@ -59,11 +75,11 @@ def validate_product_id(product_id: str) -> tuple[bool, str]:
         return False, "Product ID too long (max 50 characters)"
     return True, ""
 
-def validate_price(price: float) -> tuple[bool, str]:
-    """Validate price value."""
+def validate_price(price: int) -> tuple[bool, str]:
+    """Validate price value (whole UGX)."""
     if price < 0:
         return False, "Price cannot be negative"
-    if price > 999999.99:
+    if price > 999999:
         return False, "Price too large"
     return True, ""
 
@@ -9,6 +9,10 @@ if errorlevel 1 (
     python -m pip install pyinstaller
 )
 
+REM Compact the stylesheet so the bundle ships assets\styles.min.qss
+echo Compacting stylesheet...
+python -c "from app.main import write_compact_stylesheet; write_compact_stylesheet()"
+
 REM Build the executable using the spec file
 echo Building with spec file...
 python -m PyInstaller AlcoholPOS.spec
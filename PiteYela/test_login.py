@@ -10,21 +10,26 @@ print("=" * 50)
 # Test admin login
 success, user, msg = login('admin', 'admin123')
 
+# The report is collected and written in one go
 if success:
-    print("[SUCCESS] LOGIN SUCCESSFUL!")
-    print(f"Username: {user['username']}")
-    print(f"Full Name: {user['full_name']}")
-    print(f"Role: {user['role']}")
-    print()
-    print("You can use these credentials to login:")
-    print("  Username: admin")
-    print("  Password: admin123")
+    lines = [
+        "[SUCCESS] LOGIN SUCCESSFUL!",
+        f"Username: {user['username']}",
+        f"Full Name: {user['full_name']}",
+        f"Role: {user['role']}",
+        "",
+        "You can use these credentials to login:",
+        "  Username: admin",
+        "  Password: admin123",
+    ]
 else:
-    print("[FAILED] LOGIN FAILED!")
-    print(f"Error: {msg}")
-    print()
-    print("The admin user may not exist. Run:")
-    print("  python init_database.py")
-
-print("=" * 50)
+    lines = [
+        "[FAILED] LOGIN FAILED!",
+        f"Error: {msg}",
+        "",
+        "The admin user may not exist. Run:",
+        "  python init_database.py",
+    ]
+lines.append("=" * 50)
 
+sys.stdout.write("\n".join(lines) + "\n")
@@ -0,0 +1,46 @@
+"""
+Shared pytest fixtures for the Alcohol POS System tests.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+
+import app.database
+from app.database import init_db, get_connection, close_all_connections
+
+# tmpfs mount; a database there never waits on the disk to sync
+SHM_DIR = Path("/dev/shm")
+
+@pytest.fixture(scope="session", autouse=True)
+def db(tmp_path_factory):
+    """
+    Initialized connection to a fresh database file for the test session.
+    
+    init_db runs once per session. Each session (and each xdist worker)
+    gets its own file, so test runs never touch the real POS database or
+    contend for one file. The file lives in RAM when the OS has /dev/shm,
+    else in pytest's temp dir. Tests share its rows, so a test that asserts
+    on a row must seed it itself (see the function-scoped fixtures).
+    """
+    if SHM_DIR.is_dir() and os.access(SHM_DIR, os.W_OK):
+        db_dir = Path(tempfile.mkdtemp(prefix="pos-test-", dir=SHM_DIR))
+    else:
+        db_dir = tmp_path_factory.mktemp("db")
+    try:
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(app.database, "DB_PATH", db_dir / "pos.db")
+            # db_dir already exists; don't create the real data directories
+            mp.setattr(app.database, "_dirs_ready", True)
+            close_all_connections()
+            init_db()
+            yield get_connection()
+            close_all_connections()
+    finally:
+        if db_dir.parent == SHM_DIR:
+            shutil.rmtree(db_dir, ignore_errors=True)
@@ -1,83 +1,117 @@
 """
 Basic database tests for Alcohol POS System.
 """
-import sys
-import os
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
 
-from app.database import init_db, get_connection, test_connection
-from app.models import get_product, create_sale
-from app.auth import login, create_user
+from app.database import init_db, get_connection
+from app.database import test_connection as check_connection
+from app.models import (
+    get_product, create_sale, update_inventory_after_sale, invalidate_product_cache
+)
+from app.auth import login
+
+# Kept as one constant so repeated seeding reuses the cached prepared statement.
+# An upsert updates an existing row in place, where INSERT OR REPLACE
+# would delete and re-insert it. Reseeding also clears the units sold.
+INSERT_PRODUCT_SQL = """
+    INSERT INTO products
+    (id, name, description, cost_price, selling_price, profit, quantity_stocked, quantity_available)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(id) DO UPDATE SET
+        name = excluded.name,
+        description = excluded.description,
+        cost_price = excluded.cost_price,
+        selling_price = excluded.selling_price,
+        profit = excluded.profit,
+        quantity_stocked = excluded.quantity_stocked,
+        quantity_sold = 0,
+        quantity_available = excluded.quantity_available
+"""
+
+# Seed rows for INSERT_PRODUCT_SQL; more products only need more tuples here
+TEST_PRODUCTS = [
+    ("TEST001", "Test Product", "Test Description", 10, 15, 5, 100, 100),
+    ("TEST002", "Test Spirit", "", 25000, 32000, 7000, 12, 12),
+]
+
+@pytest.fixture
+def products(db):
+    """
+    Reseed TEST_PRODUCTS before each test; the connection commits them as one transaction.
+    
+    The upsert resets every seeded column, so a test sees the rows as listed
+    here whatever an earlier test did to them.
+    """
+    with db:
+        db.executemany(INSERT_PRODUCT_SQL, TEST_PRODUCTS)
+    invalidate_product_cache()
+
+# Rows the sale tests sell from, kept apart from TEST_PRODUCTS
+SALE_PRODUCTS = [
+    ("SALE001", "Sale Product", "", 10, 15, 5, 100, 100),
+    ("SALE002", "Sale Spirit", "", 25000, 32000, 7000, 12, 12),
+]
+
+@pytest.fixture
+def sale_products(db):
+    """Seed SALE_PRODUCTS fresh for a test that changes their stock."""
+    with db:
+        db.executemany(INSERT_PRODUCT_SQL, SALE_PRODUCTS)
+    invalidate_product_cache()
 
 def test_database_init():
     """Test database initialization."""
-    print("Testing database initialization...")
-    try:
-        init_db()
-        assert test_connection(), "Database connection failed"
-        print("[OK] Database initialized successfully")
-        return True
-    except Exception as e:
-        print(f"[ERROR] Database initialization failed: {e}")
-        return False
+    # Running it again on an initialized database must be harmless
+    init_db()
+    assert check_connection(), "Database connection failed"
+    # get_connection applies WAL and the other pragmas to every connection
+    journal_mode = get_connection().execute("PRAGMA journal_mode").fetchone()[0]
+    assert journal_mode == "wal", f"Expected WAL journal mode, got {journal_mode}"
 
 def test_user_creation():
     """Test user creation and login."""
-    print("Testing user creation and login...")
-    try:
-        # Test login with default admin
-        success, user, msg = login("admin", "admin123")
-        assert success, f"Default admin login failed: {msg}"
-        print("[OK] Default admin login successful")
-        return True
-    except Exception as e:
-        print(f"[ERROR] User test failed: {e}")
-        return False
+    # Test login with default admin
+    success, user, msg = login("admin", "admin123")
+    assert success, f"Default admin login failed: {msg}"
 
-def test_product_operations():
+@pytest.mark.usefixtures("products")
+@pytest.mark.parametrize("row", TEST_PRODUCTS, ids=lambda row: row[0])
+def test_product_operations(row):
     """Test product operations."""
-    print("Testing product operations...")
-    try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        
-        # Insert test product
-        cursor.execute("""
-            INSERT OR REPLACE INTO products 
-            (id, name, description, cost_price, selling_price, profit, quantity_stocked, quantity_available)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, ("TEST001", "Test Product", "Test Description", 10.0, 15.0, 5.0, 100, 100))
-        conn.commit()
-        
-        # Retrieve product
-        product = get_product("TEST001")
-        assert product is not None, "Product not found"
-        assert product.name == "Test Product", "Product name mismatch"
-        assert product.profit == 5.0, "Profit calculation error"
-        assert product.quantity_available == 100, "Quantity available error"
-        
-        print("[OK] Product operations successful")
-        return True
-    except Exception as e:
-        print(f"[ERROR] Product test failed: {e}")
-        return False
-    finally:
-        conn.close()
-
-if __name__ == "__main__":
-    print("Running database tests...\n")
-    
-    results = []
-    results.append(test_database_init())
-    results.append(test_user_creation())
-    results.append(test_product_operations())
+    product_id, name, _, cost_price, selling_price, _, quantity_stocked, _ = row
     
-    print(f"\nTests passed: {sum(results)}/{len(results)}")
+    # Retrieve product
+    product = get_product(product_id)
+    assert product is not None, "Product not found"
+    assert product.name == name, "Product name mismatch"
+    assert product.profit == selling_price - cost_price, "Profit calculation error"
+    assert product.quantity_available == quantity_stocked, "Quantity available error"
+
+def _quantity_sold(db, product_id):
+    return db.execute("SELECT quantity_sold FROM products WHERE id = ?", (product_id,)).fetchone()[0]
+
+@pytest.mark.usefixtures("sale_products")
+def test_create_sale_sums_repeated_products(db):
+    """A product listed twice in one cart is sold once per line."""
+    product_id, name, _, _, selling_price, _, _, _ = SALE_PRODUCTS[1]
+    before = _quantity_sold(db, product_id)
+    items = [
+        {'product_id': product_id, 'product_name': name, 'quantity': quantity,
+         'unit_price': selling_price, 'line_total': selling_price * quantity}
+        for quantity in (2, 3)
+    ]
     
-    if all(results):
-        print("All tests passed!")
-        sys.exit(0)
-    else:
-        print("Some tests failed!")
-        sys.exit(1)
+    sale_id = create_sale(1, "Administrator", items)
+    assert sale_id is not None, "Sale was not created"
+    assert _quantity_sold(db, product_id) == before + 5, "Repeated product not summed"
+    assert get_product(product_id).quantity_sold == before + 5, "Product cache kept old stock"
 
+@pytest.mark.usefixtures("sale_products")
+def test_update_inventory_after_sale(db):
+    """Inventory updates sum repeated IDs and refresh cached products."""
+    product_id = SALE_PRODUCTS[0][0]
+    before = get_product(product_id).quantity_sold  # Caches the product
+    
+    assert update_inventory_after_sale([(product_id, 1), (product_id, 2)])
+    assert _quantity_sold(db, product_id) == before + 3, "Repeated product not summed"
+    assert get_product(product_id).quantity_sold == before + 3, "Product cache kept old stock"